@@ -24,9 +24,18 @@ st.markdown("---")
 from sample_xlsx import generate_xlsx_template_student, generate_xlsx_template_lecturer
 from sample_docx import generate_docx_template_student, generate_docx_template_lecturer
 from sample_csv import generate_csv_template_student, generate_csv_template_lecturer
-from utils.file_reader import read_uploaded_file
-from utils.reports import generate_report
-from utils.assigner import assign_students
+from utils.pipeline import load_students, load_lecturers, load_previous_assignment, mode_column_errors, assignment_job, bundle_job
+from utils.reports import generate_reports
+from utils.jobs import job_runner
+from utils.model import Assignment
+from utils.store import open_store
+from utils.instrumentation import Tracker
+from utils.cache import frame_fingerprint
+from utils.views import collated_view, page_markdown
+from utils.search import search_index
+from utils.validation import issue_messages
+import itertools
+import secrets
 
 st.set_page_config(page_title="Student–Lecturer Assignment Tool", layout="centered")
 
@@ -65,18 +74,20 @@ with st.expander("File Format Examples and Tips"):
     - Optional: Field, Specialization, Department, Max_Students (any of these will work)
     """)
 
+# Templates are passed as callables: each is built (and openpyxl or python-docx
+# imported) only when its button is clicked, then cached for the process
 with st.expander("Download Sample Templates"):
     colA, colB = st.columns(2)
     with colA:
         st.subheader("Student Templates")
-        st.download_button("CSV", generate_csv_template_student(), "student_template.csv")
-        st.download_button("Excel", generate_xlsx_template_student(), "student_template.xlsx")
-        st.download_button("Word", generate_docx_template_student(), "student_template.docx")
+        st.download_button("CSV", generate_csv_template_student, "student_template.csv")
+        st.download_button("Excel", generate_xlsx_template_student, "student_template.xlsx")
+        st.download_button("Word", generate_docx_template_student, "student_template.docx")
     with colB:
         st.subheader("Lecturer Templates")
-        st.download_button("CSV", generate_csv_template_lecturer(), "lecturer_template.csv")
-        st.download_button("Excel", generate_xlsx_template_lecturer(), "lecturer_template.xlsx")
-        st.download_button("Word", generate_docx_template_lecturer(), "lecturer_template.docx")
+        st.download_button("CSV", generate_csv_template_lecturer, "lecturer_template.csv")
+        st.download_button("Excel", generate_xlsx_template_lecturer, "lecturer_template.xlsx")
+        st.download_button("Word", generate_docx_template_lecturer, "lecturer_template.docx")
 st.markdown("---")
 
 
@@ -84,12 +95,20 @@ st.markdown("---")
 st.markdown('<h2 style="font-size:2rem;color:#1a237e;">Assignment Settings</h2>', unsafe_allow_html=True)
 assignment_strategy = st.radio(
     "Assignment Method",
-    ["Random Assignment", "Field-Based Assignment"],
+    ["Random Assignment", "Field-Based Assignment", "Optimal Assignment", "Best of N Random Trials"],
     key="assignment_method",
     help="Choose how students are assigned to lecturers."
 )
 if assignment_strategy == "Field-Based Assignment":
-    st.info("Both files must contain a 'Field', 'Department', or 'Specialization' column for field-based assignment.")
+    st.info("Both files must contain a 'Field', 'Department', or 'Specialization' column for field-based assignment. Field names are matched ignoring case, abbreviations and words like 'Department of'; students whose field has no lecturer (or no room left) go to the most similar field with space.")
+elif assignment_strategy == "Optimal Assignment":
+    st.info("Students are matched at minimum total cost: their ranked choices first (optional 'Preferences' column, lecturer names separated by ';'), then lecturers in their field, while keeping loads balanced.")
+elif assignment_strategy == "Best of N Random Trials":
+    st.info("Many random assignments are drawn and scored; the one with the most students matched to a lecturer in their field and the most even loads is kept.")
+if assignment_strategy == "Best of N Random Trials":
+    trials = st.number_input("Number of trials", min_value=1, max_value=10000, value=200, step=50, key="trials")
+else:
+    trials = None
 use_global_max = st.checkbox("Set a global maximum number of students per lecturer", key="global_max_checkbox")
 if use_global_max:
     max_students = st.number_input(
@@ -100,6 +119,28 @@ if use_global_max:
     )
 else:
     max_students = None
+seed_input = st.number_input(
+    "Random seed",
+    min_value=0,
+    value=0,
+    step=1,
+    key="seed",
+    help="0 draws a new seed for each run. The seed used is saved with the run, so any result can be reproduced."
+)
+keep_pairings = st.checkbox(
+    "Keep existing pairings when the roster changes",
+    key="keep_pairings",
+    help="Only new students and students whose lecturer left are placed; everyone else keeps their lecturer."
+)
+if keep_pairings:
+    previous_file = st.file_uploader(
+        "Previous assignment (optional)",
+        type=["csv", "xlsx"],
+        help="A CSV or Excel report from an earlier run. Leave empty to update the assignment generated in this session.",
+        key="previous_file"
+    )
+else:
+    previous_file = None
 st.markdown("---")
 
 # User Customization: Column Mapping
@@ -113,56 +154,40 @@ with st.expander("Customize column names for your files (optional)"):
     col_map['lecturer_name'] = st.text_input("Lecturer Name column", value="name", help="Column in lecturer file for lecturer names.", key="lecturer_name_col")
     col_map['lecturer_field'] = st.text_input("Lecturer Field column", value="field", help="Column in lecturer file for field/department/specialization.", key="lecturer_field_col")
     col_map['max_students'] = st.text_input("Lecturer Max Students column", value="max_students", help="Column in lecturer file for max students.", key="max_students_col")
+    docx_table = st.number_input("Word table number", min_value=1, value=1, step=1, help="Which table to read from Word (.docx) files, counting from 1.", key="docx_table")
 
 
 # Read Data (with flexible column mapping) and show validation feedback
 student_df = None
 lecturer_df = None
 validation_issues = []
+issue_tables = []
 error_log = []
+# Stage timings and memory for the diagnostics panel
+tracker = Tracker(track_memory=st.session_state.get("trace_memory", False))
 if student_file:
     try:
-        student_df = read_uploaded_file(student_file)
-        # Map columns according to user mapping
-        for key, default in zip(['student_name', 'matric_number', 'student_field'], ['name', 'matric number', 'field']):
-            if col_map[key] != default and col_map[key] in student_df.columns:
-                student_df[default] = student_df[col_map[key]]
-        if "field" not in student_df.columns:
-            for alt in [col_map['student_field'], "department", "specialization"]:
-                if alt in student_df.columns:
-                    student_df["field"] = student_df[alt]
-        required_cols = ["name", "matric number"]
-        missing_cols = [col for col in required_cols if col not in student_df.columns]
-        if missing_cols:
-            validation_issues.append(f"Student file is missing required columns: {', '.join(missing_cols)}.")
-            student_df = None
-        elif student_df.duplicated(['matric number']).any():
-            validation_issues.append("Duplicate Matric Numbers found in student file.")
-        elif student_df.empty:
-            validation_issues.append("Student file is empty.")
-            student_df = None
+        # Map columns according to user mapping (parsed once per file and mapping)
+        student_df, issues = load_students(student_file, column_map={
+            'name': col_map['student_name'],
+            'matric number': col_map['matric_number'],
+            'field': col_map['student_field'],
+        }, tracker=tracker, table_index=int(docx_table) - 1)
+        validation_issues.extend(issue_messages(issues, "Student"))
+        issue_tables.append(issues.assign(file="student"))
     except Exception as e:
         validation_issues.append(f"Error reading student file: {e}")
         error_log.append(f"Student file error: {e}")
         student_df = None
 if lecturer_file:
     try:
-        lecturer_df = read_uploaded_file(lecturer_file)
-        for key, default in zip(['lecturer_name', 'lecturer_field', 'max_students'], ['name', 'field', 'max_students']):
-            if col_map[key] != default and col_map[key] in lecturer_df.columns:
-                lecturer_df[default] = lecturer_df[col_map[key]]
-        if "field" not in lecturer_df.columns:
-            for alt in [col_map['lecturer_field'], "specialization", "department"]:
-                if alt in lecturer_df.columns:
-                    lecturer_df["field"] = lecturer_df[alt]
-        if "name" not in lecturer_df.columns:
-            validation_issues.append("Lecturer file must contain at least a 'name' column.")
-            lecturer_df = None
-        elif lecturer_df.duplicated(['name']).any():
-            validation_issues.append("Duplicate lecturer names found in lecturer file.")
-        elif lecturer_df.empty:
-            validation_issues.append("Lecturer file is empty.")
-            lecturer_df = None
+        lecturer_df, issues = load_lecturers(lecturer_file, column_map={
+            'name': col_map['lecturer_name'],
+            'field': col_map['lecturer_field'],
+            'max_students': col_map['max_students'],
+        }, tracker=tracker, table_index=int(docx_table) - 1)
+        validation_issues.extend(issue_messages(issues, "Lecturer"))
+        issue_tables.append(issues.assign(file="lecturer"))
     except Exception as e:
         validation_issues.append(f"Error reading lecturer file: {e}")
         error_log.append(f"Lecturer file error: {e}")
@@ -170,6 +195,12 @@ if lecturer_file:
 
 if validation_issues:
     st.warning("**Validation Issues:**\n" + "\n".join(f"- {issue}" for issue in validation_issues))
+    # Every affected row, not just the first problem
+    issue_table = pd.concat([t for t in issue_tables if not t.empty] or [pd.DataFrame()], ignore_index=True)
+    if not issue_table.empty:
+        with st.expander(f"All validation issues ({len(issue_table)})"):
+            st.dataframe(issue_table.head(1000))
+            st.download_button("Download Validation Issues (CSV)", data=issue_table.to_csv(index=False).encode(), file_name="validation_issues.csv", mime="text/csv")
 st.markdown("---")
 
 
@@ -180,6 +211,7 @@ output_format = st.multiselect(
     ["PDF", "Word", "CSV", "Excel"],
     default=["PDF"]
 )
+split_reports = st.checkbox("Include one report per lecturer in the ZIP download", key="split_reports")
 st.markdown("---")
 
 # Help/FAQ Section
@@ -218,80 +250,232 @@ if st.button("Generate Assignment", key="generate_btn"):
     elif not output_format:
         st.warning("Please select at least one output format.")
     else:
-        mode = "field" if assignment_strategy == "Field-Based Assignment" else "random"
-        if mode == "field":
-            if "field" not in student_df.columns:
-                st.error("Field-based assignment requires a 'field' column in the student file.")
-                st.stop()
-            if "field" not in lecturer_df.columns:
-                st.error("Field-based assignment requires a 'field' column in the lecturer file.")
-                st.stop()
-        # Progress spinner
-        with st.spinner("Assigning students to lecturers and generating reports..."):
-            try:
-                assignment_flat = assign_students(student_df, lecturer_df, mode, max_students)
-            except Exception as e:
-                error_log.append(f"Assignment error: {e}")
-                st.error(f"Assignment failed: {e}")
-                assignment_flat = None
-        if assignment_flat is not None and not assignment_flat.empty:
-            # Assignment summary
-            total_students = len(student_df)
-            total_assigned = len(assignment_flat)
-            total_unassigned = total_students - total_assigned
-            total_lecturers = len(assignment_flat['assigned lecturer'].unique())
-            st.success(f"Assignment complete.\n\n**Summary:**\n- Total students: {total_students}\n- Assigned: {total_assigned}\n- Unassigned: {total_unassigned}\n- Lecturers: {total_lecturers}")
-            # Search/filter in preview
-            st.markdown("**Preview of first 20 students (search/filter below):**")
-            search_term = st.text_input("Search by student name, matric number, or lecturer", "", key="search_box")
-            preview_df = assignment_flat.copy()
-            if search_term:
-                search_term_lower = search_term.lower()
-                preview_df = preview_df[
-                    preview_df['student name'].str.lower().str.contains(search_term_lower) |
-                    preview_df['matric number'].astype(str).str.lower().str.contains(search_term_lower) |
-                    preview_df['assigned lecturer'].str.lower().str.contains(search_term_lower)
-                ]
-            st.dataframe(preview_df.head(20))
-            # Collated View: Grouped by Lecturer
-            st.markdown("#### Collated View (by Lecturer)")
-            for lecturer, group in assignment_flat.groupby("assigned lecturer"):
-                st.markdown(f"**{lecturer}:**")
-                students_list = [f"{row['student name']} ({row['matric number']})" for _, row in group.iterrows()]
-                st.markdown("\n".join([f"- {student}" for student in students_list]))
-                st.markdown("---")
-            unassigned = student_df[~student_df["matric number"].isin(assignment_flat["matric number"])]
-            if not unassigned.empty:
-                st.warning(f"{len(unassigned)} students could not be assigned.")
-                st.dataframe(unassigned)
-            # Download All Reports as ZIP
-            import zipfile, io
-            if len(output_format) > 1:
-                zip_buffer = io.BytesIO()
-                with zipfile.ZipFile(zip_buffer, "w") as zipf:
-                    for fmt in output_format:
-                        try:
-                            report_bytes, mime, file_name = generate_report(fmt, assignment_flat)
-                            zipf.writestr(file_name, report_bytes)
-                        except Exception as e:
-                            error_log.append(f"Report ({fmt}) error: {e}")
-                            st.error(f"Failed to generate {fmt.upper()} report: {e}")
-                st.download_button("Download All Reports (ZIP)", data=zip_buffer.getvalue(), file_name="assignment_reports.zip", mime="application/zip")
-            # Individual report downloads
+        mode = {"Field-Based Assignment": "field", "Optimal Assignment": "optimal", "Best of N Random Trials": "best"}.get(assignment_strategy, "random")
+        for message in mode_column_errors(student_df, lecturer_df, mode):
+            st.error(message)
+            st.stop()
+        # Run the assignment and reports as a background job: widget interaction
+        # reruns the script without losing the work, and the job is found again by id
+        try:
+            previous = None
+            if keep_pairings:
+                previous = load_previous_assignment(previous_file) if previous_file else st.session_state.get("assignment")
+            seed = int(seed_input) or secrets.randbits(32)
+            # The job records its stages here; they join the diagnostics panel when it finishes
+            job_tracker = Tracker(track_memory=st.session_state.get("trace_memory", False))
+            job_id = job_runner().submit(
+                assignment_job, student_df, lecturer_df, mode, output_format,
+                max_per_lecturer=max_students, seed=seed, previous=previous, trials=trials,
+                store=open_store(), label=f"{student_file.name} / {lecturer_file.name}", tracker=job_tracker,
+            )
+            st.session_state["job_id"] = job_id
+            st.session_state["job_tracker"] = (job_id, job_tracker)
+            st.query_params["job"] = job_id
+        except Exception as e:
+            error_log.append(f"Assignment error: {e}")
+            st.error(f"Assignment failed: {e}")
+
+# Background jobs: show progress while one runs and take its result once it finishes.
+# Only this fragment reruns while polling; the finished job triggers one full rerun
+@st.fragment(run_every=0.5)
+def job_progress(job, key):
+    if not job.running:
+        st.rerun()
+    st.progress(job.fraction or 0.0, text=job.message())
+    if st.button("Cancel", key=f"cancel_{key}_btn"):
+        job.cancel()
+
+job_id = st.session_state.get("job_id") or st.query_params.get("job")
+job = job_runner().get(job_id) if job_id else None
+if job is not None and job.running:
+    job_progress(job, "assignment")
+elif job is not None and st.session_state.get("job_applied") != job.id:
+    st.session_state["job_applied"] = job.id
+    job_tracker = st.session_state.get("job_tracker")
+    if job_tracker is not None and job_tracker[0] == job.id:
+        tracker.records.extend(job_tracker[1].records)
+    else:
+        # A job picked up from another session by id: only its progress stages are known
+        for record in job.stages:
+            tracker.add(record["stage"], record["wall_s"], done=record["done"], total=record["total"])
+    if job.status == "failed":
+        error_log.append(f"Assignment error: {job.error}")
+        st.error(f"Assignment failed: {job.error}")
+    elif job.status == "cancelled":
+        st.info("Assignment cancelled.")
+    elif job.result["assignment"].empty:
+        st.error("No assignments were generated. Please check your data and try again.")
+    else:
+        # Keep the result across reruns (downloads, searches) and as the base for the next incremental run
+        assignment = job.result["assignment"]
+        st.session_state["assignment"] = assignment
+        st.session_state["assignment_fingerprint"] = frame_fingerprint(assignment.frame)
+        st.session_state["collated_page"] = 1
+        st.session_state["run_id"] = job.result["run_id"]
+        error_log.extend(job.result["errors"])
+
+# Past Runs: reload an earlier result, or look a student up across cohorts
+with st.expander("Past Runs"):
+    try:
+        store = open_store()
+        past_runs = store.runs()
+    except Exception as e:
+        store = None
+        past_runs = pd.DataFrame()
+        st.error(f"Run history is unavailable: {e}")
+    if past_runs.empty:
+        st.write("No saved runs yet.")
+    else:
+        st.dataframe(past_runs)
+        run_choice = st.selectbox("Run", past_runs["id"].tolist(), format_func=lambda run: f"#{run}", key="past_run")
+        if st.button("Load run", key="load_run_btn"):
+            with tracker.span("load run"):
+                loaded = Assignment.from_frame(store.load_run(run_choice))
+            st.session_state["assignment"] = loaded
+            st.session_state["assignment_fingerprint"] = frame_fingerprint(loaded.frame)
+            st.session_state["collated_page"] = 1
+            st.session_state["run_id"] = run_choice
+        lookup = st.text_input("Find a matric number across all runs", "", key="run_lookup")
+        if lookup:
+            st.dataframe(store.find_student(lookup))
+
+assignment = st.session_state.get("assignment")
+if assignment is not None and output_format:
+    # Only the rows and columns shown are gathered from the model; the full frame is built for rendering
+    attrs = assignment.attrs
+    # Assignment summary
+    total_students = len(assignment.students)
+    total_assigned = len(assignment)
+    total_unassigned = total_students - total_assigned
+    total_lecturers = int((assignment.loads > 0).sum())
+    summary = f"Assignment complete.\n\n**Summary:**\n- Total students: {total_students}\n- Assigned: {total_assigned}\n- Unassigned: {total_unassigned}\n- Lecturers: {total_lecturers}"
+    if "satisfaction" in attrs:
+        summary += f"\n- Total cost: {attrs['total cost']}\n- Satisfaction: {attrs['satisfaction']:.1%}"
+    if attrs.get("cross-field"):
+        summary += f"\n- Placed in the nearest related field: {attrs['cross-field']}"
+    if "score" in attrs:
+        summary += f"\n- Best of {attrs['trials']} trials: {attrs['field match rate']:.1%} matched by field, load variance {attrs['load variance']:.2f}"
+    if "changed lecturers" in attrs:
+        summary += f"\n- Kept pairings: {attrs['kept']}\n- Newly placed: {attrs['placed']}\n- Lecturers with changed groups: {len(attrs['changed lecturers'])}"
+    st.success(summary)
+    # Search/filter in preview
+    st.markdown("**Preview of first 20 students (search/filter below):**")
+    search_term = st.text_input("Search by student name, matric number, or lecturer", "", key="search_box")
+    if search_term:
+        # Trigram index built once per assignment and reused on every keystroke
+        index = search_index(assignment, st.session_state["assignment_fingerprint"])
+        preview_df = assignment.take(index.search(search_term, limit=20))
+    else:
+        preview_df = assignment.head(20)
+    st.dataframe(preview_df)
+    # Collated View: Grouped by Lecturer
+    # Built once per assignment; only the current page is sent to the browser
+    st.markdown("#### Collated View (by Lecturer)")
+    collated = collated_view(assignment, st.session_state["assignment_fingerprint"])
+    page_size = st.selectbox("Lecturers per page", [10, 25, 50, 100], index=1, key="collated_page_size")
+    page_count = max(1, -(-len(collated) // page_size))
+    if page_count > 1:
+        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, step=1, key="collated_page")
+    else:
+        page = 1
+    st.markdown(page_markdown(collated, min(page, page_count), page_size))
+    unassigned = assignment.unassigned()
+    if not unassigned.empty:
+        st.warning(f"{len(unassigned)} students could not be assigned.")
+        st.dataframe(unassigned)
+    # Render all formats in parallel; each download button appears as soon as its report is ready.
+    # Reports saved with the run are served as stored; the rest are rendered and saved.
+    # The results are kept in session state per assignment and format choice, so searches,
+    # paging and other reruns only redraw the download buttons
+    reports_key = (st.session_state["assignment_fingerprint"], tuple(output_format))
+    prepared = st.session_state.get("prepared_reports")
+    fresh = prepared is None or prepared["key"] != reports_key
+    if fresh:
+        prepared = {"key": reports_key, "results": []}
+        run_id = st.session_state.get("run_id")
+        stored = {}
+        if run_id is not None:
             for fmt in output_format:
+                report = open_store().load_report(run_id, fmt)
+                if report is not None:
+                    stored[fmt] = report
+        # Each format's render time is recorded on the tracker, measured where it was rendered
+        rendered = generate_reports([fmt for fmt in output_format if fmt not in stored], assignment, tracker=tracker)
+        results = itertools.chain(((fmt, report, None) for fmt, report in stored.items()), rendered)
+    else:
+        results = prepared["results"]
+    reports = {}
+    for fmt, report, error in results:
+        if fresh:
+            prepared["results"].append((fmt, report, error))
+            if error is not None:
+                error_log.append(f"Report ({fmt}) error: {error}")
+            elif run_id is not None and fmt not in stored:
                 try:
-                    report_bytes, mime, file_name = generate_report(fmt, assignment_flat)
-                    st.download_button(f"Download {fmt.upper()}", data=report_bytes, file_name=file_name, mime=mime)
+                    open_store().save_report(run_id, fmt, report)
                 except Exception as e:
-                    error_log.append(f"Report ({fmt}) error: {e}")
-                    st.error(f"Failed to generate {fmt.upper()} report: {e}")
-        else:
-            st.error("No assignments were generated. Please check your data and try again.")
-    # Error Logging: Download log if any errors
-    if error_log:
-        import io
-        log_bytes = io.StringIO("\n".join(error_log)).getvalue().encode()
-        st.download_button("Download Error Log", data=log_bytes, file_name="assignment_error_log.txt", mime="text/plain")
+                    error_log.append(f"Run store error: {e}")
+        if error is not None:
+            st.error(f"Failed to generate {fmt.upper()} report: {error}")
+            continue
+        reports[fmt] = report
+        report_bytes, mime, file_name = report
+        st.download_button(f"Download {fmt.upper()}", data=report_bytes, file_name=file_name, mime=mime)
+    if fresh:
+        # Kept only once every format is done, so an interrupted run starts over
+        st.session_state["prepared_reports"] = prepared
+    # Download All Reports as ZIP (streamed entry by entry, optionally one folder per lecturer),
+    # built once per assignment, format choice and split setting by a background job.
+    # The spooled archive is kept, not its bytes; they are read only when the button is clicked
+    if reports and (len(output_format) > 1 or split_reports):
+        bundle_key = (reports_key, split_reports)
+        bundle = st.session_state.get("prepared_bundle")
+        if bundle is not None and bundle[0] != bundle_key:
+            bundle[1].close()
+            bundle = st.session_state["prepared_bundle"] = None
+        if bundle is None:
+            pending = st.session_state.get("bundle_job")
+            if pending is None or pending[0] != bundle_key:
+                if pending is not None:
+                    job_runner().cancel(pending[1])
+                bundle_tracker = Tracker(track_memory=st.session_state.get("trace_memory", False))
+                bundle_job_id = job_runner().submit(
+                    bundle_job, [fmt for fmt in output_format if fmt in reports], assignment,
+                    split_by_lecturer=split_reports, tracker=bundle_tracker, label="report bundle",
+                )
+                pending = st.session_state["bundle_job"] = (bundle_key, bundle_job_id, bundle_tracker)
+            bundle_job_state = job_runner().get(pending[1])
+            if bundle_job_state is None:
+                st.session_state["bundle_job"] = None
+            elif bundle_job_state.running:
+                job_progress(bundle_job_state, "bundle")
+            elif bundle_job_state.status == "done":
+                tracker.records.extend(pending[2].records)
+                bundle = st.session_state["prepared_bundle"] = (bundle_key, bundle_job_state.result)
+                st.session_state["bundle_job"] = None
+            elif bundle_job_state.status == "failed":
+                # Kept, so the failed bundle is not retried on every rerun
+                error_log.append(f"Report (ZIP) error: {bundle_job_state.error}")
+                st.error(f"Failed to build ZIP bundle: {bundle_job_state.error}")
+            else:
+                st.info("ZIP bundle cancelled.")
+        if bundle is not None:
+            def archive_bytes(archive=bundle[1]):
+                archive.seek(0)
+                return archive.read()
+            st.download_button("Download All Reports (ZIP)", data=archive_bytes, file_name="assignment_reports.zip", mime="application/zip")
+
+# Diagnostics: where the time and memory went in this run
+with st.expander("Diagnostics"):
+    st.checkbox("Trace peak memory per stage (slows every stage down)", key="trace_memory")
+    if tracker.records:
+        st.dataframe(tracker.to_frame())
+        st.download_button("Download Diagnostics (JSON)", data=tracker.to_json().encode(), file_name="assignment_diagnostics.json", mime="application/json")
+# Error Logging: Download log if any errors
+if error_log:
+    import io
+    log_bytes = io.StringIO("\n".join(error_log + ["", "Diagnostics:", tracker.to_log_lines()])).getvalue().encode()
+    st.download_button("Download Error Log", data=log_bytes, file_name="assignment_error_log.txt", mime="text/plain")
 
 st.markdown(
     '''
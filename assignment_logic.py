@@ -1,63 +1,82 @@
+import numpy as np
 import pandas as pd
-import random
-from collections import defaultdict
+from utils.assigner import lecturer_capacities, _group_positions
+from utils.model import Assignment
 
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     df.columns = df.columns.str.strip().str.lower()
     return df
 
-def assign_students_randomly(students: pd.DataFrame, lecturers: pd.DataFrame) -> dict:
+def assign_students_randomly(students: pd.DataFrame, lecturers: pd.DataFrame, seed=None) -> Assignment:
     students = normalize_columns(students)
     lecturers = normalize_columns(lecturers)
 
-    assignment = defaultdict(list)
-    lecturer_pool = []
-
-    for _, row in lecturers.iterrows():
-        lecturer_pool.extend([row['name']] * int(row['max_students']))
-
-    random.shuffle(lecturer_pool)
-
-    if len(students) > len(lecturer_pool):
+    capacities = lecturer_capacities(lecturers, default=0)
+    if len(students) > capacities.sum():
         raise ValueError("Not enough lecturer slots to assign all students.")
 
-    for _, student in students.iterrows():
-        assigned_lecturer = lecturer_pool.pop()
-        assignment[assigned_lecturer].append(student.to_dict())
-
-    return assignment
+    # One shuffled pool with a slot per unit of capacity; students take slots from
+    # the end in file order, so lecturers fill in proportion to their capacity
+    pool = np.random.default_rng(seed).permutation(np.repeat(np.arange(len(lecturers)), capacities.astype(int)))
+    lecturer_pos = pool[::-1][:len(students)]
+    student_pos = np.arange(len(students))
+    display = _first_seen_order(lecturer_pos, len(lecturers))
+    return Assignment(students, lecturers, student_pos[display], lecturer_pos[display])
 
-def assign_students_by_field_balanced(students: pd.DataFrame, lecturers: pd.DataFrame) -> dict:
+def assign_students_by_field_balanced(students: pd.DataFrame, lecturers: pd.DataFrame) -> Assignment:
     students = normalize_columns(students)
     lecturers = normalize_columns(lecturers)
 
-    assignment = defaultdict(list)
-    lecturers_copy = lecturers.copy()
-    lecturers_copy['remaining_slots'] = lecturers_copy['max_students']
+    # Field by field in sorted order, each dealt round-robin from the first lecturer
+    # over those with slots left; students without a field are not assigned
+    remaining = np.minimum(lecturer_capacities(lecturers, default=0), len(students)).astype(int)
+    codes, fields = pd.factorize(students["field"], sort=True)
+    order, offsets = _group_positions(codes, len(fields))
+    student_parts = []
+    lecturer_parts = []
+    for code in range(len(fields)):
+        field_students = order[offsets[code]:offsets[code + 1]]
+        picks = _round_robin(remaining, len(field_students))
+        if len(picks) < len(field_students):
+            raise ValueError("Unable to assign student: All lecturer slots are filled.")
+        remaining -= np.bincount(picks, minlength=len(remaining))
+        student_parts.append(field_students)
+        lecturer_parts.append(picks)
+    student_pos = np.concatenate(student_parts) if student_parts else np.array([], dtype=int)
+    lecturer_pos = np.concatenate(lecturer_parts) if lecturer_parts else np.array([], dtype=int)
 
-    grouped_students = students.groupby('field')
-    lecturers_pool = lecturers_copy.to_dict(orient='records')
+    display = _first_seen_order(lecturer_pos, len(lecturers))
+    return Assignment(students, lecturers, student_pos[display], lecturer_pos[display])
 
-    for field, group in grouped_students:
-        student_list = group.to_dict(orient='records')
-        lecturer_index = 0
-        for student in student_list:
-            assigned = False
-            attempts = 0
-            while not assigned and attempts < len(lecturers_pool):
-                lecturer = lecturers_pool[lecturer_index]
-                if lecturer['remaining_slots'] > 0:
-                    assignment[lecturer['name']].append(student)
-                    lecturer['remaining_slots'] -= 1
-                    assigned = True
-                lecturer_index = (lecturer_index + 1) % len(lecturers_pool)
-                attempts += 1
-            if not assigned:
-                raise ValueError("Unable to assign student: All lecturer slots are filled.")
+def _first_seen_order(lecturer_pos, n_lecturers):
+    # Rows grouped by lecturer, lecturers in the order they first received a
+    # student, as the dict of lists was
+    first_seen = np.full(n_lecturers, len(lecturer_pos))
+    np.minimum.at(first_seen, lecturer_pos, np.arange(len(lecturer_pos)))
+    return np.argsort(first_seen[lecturer_pos], kind="stable")
 
-    return assignment
+def _round_robin(remaining, n):
+    """
+    Lecturer positions for n students dealt one per lecturer per round,
+    in lecturer order, skipping lecturers with no slots left. Returns
+    fewer than n when the slots run out.
+    """
+    # Fewest rounds that reach n students; only the slots of those rounds are laid out
+    low, high = 0, int(min(remaining.max(initial=0), n))
+    while low < high:
+        middle = (low + high) // 2
+        if np.minimum(remaining, middle).sum() >= n:
+            high = middle
+        else:
+            low = middle + 1
+    slots = np.minimum(remaining, low)
+    lecturer_slots = np.repeat(np.arange(len(remaining)), slots)
+    rounds = np.arange(len(lecturer_slots)) - np.repeat(np.cumsum(slots) - slots, slots)
+    return lecturer_slots[np.lexsort((lecturer_slots, rounds))][:n]
 
-def flatten_assignment(assignment: dict) -> pd.DataFrame:
+def flatten_assignment(assignment) -> pd.DataFrame:
+    if isinstance(assignment, Assignment):
+        return assignment.records()
     rows = []
     for lecturer, students in assignment.items():
         for student in students:
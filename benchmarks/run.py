@@ -0,0 +1,113 @@
+"""
+Times and memory-profiles each stage (file reading, assignment modes,
+report formats) on synthetic rosters and writes JSON results.
+
+    python -m benchmarks.run --sizes 1000,10000,100000 --output bench.json
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from benchmarks.synthetic import NamedBytesIO, generate_roster, to_file_bytes
+from utils.assigner import assign_students
+from utils.file_reader import clear_parse_cache, read_uploaded_file
+from utils.reports import clear_report_cache, generate_report
+
+READ_FORMATS = ["csv", "xlsx", "docx"]
+MODES = ["random", "field", "optimal", "best"]
+REPORT_FORMATS = ["csv", "excel", "pdf", "pdf-canvas", "word"]
+
+def measure(func, memory=True):
+    """
+    Runs func once and returns (result, seconds, peak MiB or None).
+    Memory is measured in a second run under tracemalloc, so the timing
+    is not distorted by tracing.
+    """
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return result, seconds, peak
+
+def run_size(size, args):
+    students, lecturers = generate_roster(size, n_fields=args.fields, capacity_skew=args.skew, seed=args.seed)
+    results = []
+
+    def record(stage, func, rows):
+        try:
+            result, seconds, peak = measure(func, memory=not args.no_memory)
+            results.append({"stage": stage, "size": size, "rows": rows, "seconds": round(seconds, 4),
+                            "peak_mib": None if peak is None else round(peak, 2)})
+            print(f"{size:>8} {stage:<16} {seconds:9.3f}s" + ("" if peak is None else f" {peak:9.1f} MiB"), file=sys.stderr)
+            return result
+        except Exception as e:
+            results.append({"stage": stage, "size": size, "rows": rows, "error": f"{type(e).__name__}: {e}"})
+            print(f"{size:>8} {stage:<16} failed: {e}", file=sys.stderr)
+            return None
+
+    for fmt in args.read_formats:
+        data = to_file_bytes(students, fmt)
+
+        def read(data=data, fmt=fmt):
+            clear_parse_cache()
+            return read_uploaded_file(NamedBytesIO(data, f"students.{fmt}"))
+        record(f"read_{fmt}", read, size)
+
+    student_df = students.rename(columns=str.lower)
+    lecturer_df = lecturers.rename(columns=str.lower)
+    assignment = None
+    for mode in args.modes:
+        result = record(f"assign_{mode}", lambda mode=mode: assign_students(student_df, lecturer_df, mode, seed=args.seed), size)
+        if assignment is None and result is not None and not result.empty:
+            assignment = result
+
+    if assignment is not None:
+        for fmt in args.report_formats:
+            def render(fmt=fmt):
+                clear_report_cache()
+                return generate_report(fmt, assignment.copy())
+            record(f"report_{fmt}", render, len(assignment))
+    return results
+
+def _csv_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=lambda v: [int(x) for x in _csv_list(v)], default=[1000, 10000, 100000])
+    parser.add_argument("--fields", type=int, default=80, help="Number of distinct fields.")
+    parser.add_argument("--skew", type=float, default=0.5, help="Lognormal sigma of lecturer capacities.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--read-formats", type=_csv_list, default=READ_FORMATS)
+    parser.add_argument("--modes", type=_csv_list, default=MODES)
+    parser.add_argument("--report-formats", type=_csv_list, default=REPORT_FORMATS)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass.")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args))
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"fields": args.fields, "skew": args.skew, "seed": args.seed},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as out:
+            out.write(text)
+    else:
+        print(text)
+    return 1 if any("error" in r for r in results) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
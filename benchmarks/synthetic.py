@@ -0,0 +1,85 @@
+"""
+Synthetic student and lecturer rosters of configurable size for benchmarks.
+"""
+import io
+import numpy as np
+import pandas as pd
+
+def generate_roster(n_students, n_lecturers=None, n_fields=20, capacity_skew=0.5, slack=1.2, seed=0):
+    """
+    Returns (students, lecturers) DataFrames with the app's column names.
+    Field sizes follow a Zipf-like curve so some fields are crowded;
+    capacity_skew is the lognormal sigma of Max_Students (0 = equal
+    capacities), scaled so each field's capacity is about `slack` x its
+    students.
+    """
+    rng = np.random.default_rng(seed)
+    if n_lecturers is None:
+        n_lecturers = max(1, n_students // 25)
+    fields = np.array([f"Field {i:03d}" for i in range(n_fields)], dtype=object)
+    weights = 1.0 / np.arange(1, n_fields + 1)
+    weights /= weights.sum()
+
+    student_fields = rng.choice(n_fields, size=n_students, p=weights)
+    students = pd.DataFrame({
+        "Name": [f"Student {i}" for i in range(n_students)],
+        "Matric Number": [f"SYN/{i:07d}/{seed % 100:02d}" for i in range(n_students)],
+        "Field": fields[student_fields],
+    })
+
+    # Every field gets a lecturer before the rest follow the field weights
+    lecturer_fields = np.concatenate([
+        np.arange(min(n_fields, n_lecturers)),
+        rng.choice(n_fields, size=max(0, n_lecturers - n_fields), p=weights),
+    ])
+    # Capacities cover each field's demand times `slack`, split unevenly among its lecturers
+    demand = np.bincount(student_fields, minlength=n_fields)
+    raw = rng.lognormal(mean=0.0, sigma=capacity_skew, size=n_lecturers)
+    field_raw = np.bincount(lecturer_fields, weights=raw, minlength=n_fields)
+    capacities = np.maximum(1, np.ceil(raw / field_raw[lecturer_fields] * demand[lecturer_fields] * slack)).astype(int)
+    lecturers = pd.DataFrame({
+        "Name": [f"Dr. Lecturer {i}" for i in range(n_lecturers)],
+        "Max_Students": capacities,
+        "Field": fields[lecturer_fields],
+    })
+    return students, lecturers
+
+def to_file_bytes(df, fmt):
+    """
+    Serializes a roster as CSV, XLSX or DOCX (first table) bytes.
+    """
+    if fmt == "csv":
+        return df.to_csv(index=False).encode()
+    if fmt == "xlsx":
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False)
+        return buffer.getvalue()
+    if fmt == "docx":
+        return _docx_bytes(df)
+    raise ValueError(f"Unsupported format: {fmt}")
+
+def _docx_bytes(df):
+    # Bulk table XML; python-docx add_row is far too slow for 100k-row inputs
+    from xml.sax.saxutils import escape
+    from docx import Document
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+
+    def row(values):
+        return "<w:tr>" + "".join(f"<w:tc><w:p><w:r><w:t>{escape(str(v))}</w:t></w:r></w:p></w:tc>" for v in values) + "</w:tr>"
+
+    doc = Document()
+    xml = f"<w:tbl {nsdecls('w')}><w:tblPr/>" + row(df.columns) + "".join(row(v) for v in df.itertuples(index=False, name=None)) + "</w:tbl>"
+    doc.element.body.insert_element_before(parse_xml(xml), "w:sectPr")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+class NamedBytesIO(io.BytesIO):
+    """
+    In-memory file with a name, standing in for a Streamlit upload.
+    """
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
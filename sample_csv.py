@@ -1,7 +1,9 @@
 # sample_csv.py
 import pandas as pd
 import io
+from functools import lru_cache
 
+@lru_cache(maxsize=None)
 def generate_csv_template_student():
     df = pd.DataFrame({
         "Name": ["John Doe", "Jane Smith"],
@@ -12,6 +14,7 @@ def generate_csv_template_student():
     df.to_csv(buffer, index=False)
     return buffer.getvalue()
 
+@lru_cache(maxsize=None)
 def generate_csv_template_lecturer():
     df = pd.DataFrame({
         "Name": ["Dr. Smith", "Dr. Johnson"],
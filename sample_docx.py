@@ -1,7 +1,11 @@
-from docx import Document
 import io
+from functools import lru_cache
 
+# Templates are built once per process; python-docx is only imported then
+
+@lru_cache(maxsize=None)
 def generate_docx_template_student():
+    from docx import Document
     doc = Document()
     doc.add_heading("Student Template", 0)
     table = doc.add_table(rows=3, cols=3)
@@ -20,10 +24,11 @@ def generate_docx_template_student():
 
     buffer = io.BytesIO()
     doc.save(buffer)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
 
+@lru_cache(maxsize=None)
 def generate_docx_template_lecturer():
+    from docx import Document
     doc = Document()
     doc.add_heading("Lecturer Template", 0)
     table = doc.add_table(rows=1, cols=3)
@@ -42,5 +47,4 @@ def generate_docx_template_lecturer():
 
     buffer = io.BytesIO()
     doc.save(buffer)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
@@ -1,7 +1,11 @@
-from openpyxl import Workbook
 import io
+from functools import lru_cache
 
+# Templates are built once per process; openpyxl is only imported then
+
+@lru_cache(maxsize=None)
 def generate_xlsx_template_student():
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Students"
@@ -11,10 +15,11 @@ def generate_xlsx_template_student():
 
     buffer = io.BytesIO()
     wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
 
+@lru_cache(maxsize=None)
 def generate_xlsx_template_lecturer():
+    from openpyxl import Workbook
     wb = Workbook()
     ws = wb.active
     ws.title = "Lecturers"
@@ -24,5 +29,4 @@ def generate_xlsx_template_lecturer():
 
     buffer = io.BytesIO()
     wb.save(buffer)
-    buffer.seek(0)
-    return buffer
+    return buffer.getvalue()
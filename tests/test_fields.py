@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.assigner import assign_students
+from utils.fields import FieldIndex, field_key, field_tokens
+
+@pytest.mark.parametrize("a, b", [
+    ("Dept. of Computer Science", "computer science"),
+    ("CS", "Computer Science"),
+    ("CSC", "Comp. Sci."),
+    ("AI", "Artificial Intelligence"),
+    ("Stats", "Statistics"),
+    ("Department of Mathematics", "Maths"),
+    ("School of Physics", "physics"),
+    ("Elec. Eng.", "Electrical Engineering"),
+    ("Faculty of Economics", "econ"),
+    ("Science, Computer", "computer science"),
+])
+def test_spellings_of_one_field_share_a_key(a, b):
+    assert field_key(a) == field_key(b)
+
+@pytest.mark.parametrize("a, b", [
+    ("Computer Engineering", "Computer Science"),
+    ("IT", "ICT"),
+    ("Mathematics and Statistics", "Statistics"),
+    ("Biology", "Chemistry"),
+    # Only unit words: each falls back to its own text instead of colliding on an empty key
+    ("Department", "School of Studies"),
+    ("Department", ""),
+])
+def test_different_fields_keep_apart(a, b):
+    assert field_key(a) != field_key(b)
+
+def test_tokens_drop_unit_words_and_plurals_only():
+    assert field_tokens("Department of Physics and Chemistry") == ("physic", "chemistry")
+    # "ss" endings and short words keep their last letter
+    assert field_tokens("Business Analysis") == ("business", "analysi")
+    assert field_tokens("Gas") == ("gas",)
+    # Synonyms expand to several tokens, each kept once
+    assert field_tokens("AI & Artificial Intelligence") == ("artificial", "intelligence")
+    assert field_tokens("   ") == ()
+    assert field_tokens(np.nan) == ()
+    assert field_key("  Department ") == "department"
+    assert field_key(None) is None
+
+def test_similarities_are_token_jaccard():
+    fields = ["Computer Science", "Computer Engineering", "Physics", "Dept. of Statistics", np.nan, "Studies"]
+    index = FieldIndex(fields)
+    query = "Comp. Eng."
+    expected = []
+    for field in fields:
+        a, b = set(field_tokens(field)), set(field_tokens(query))
+        expected.append(len(a & b) / len(a | b) if a & b else 0.0)
+    np.testing.assert_allclose(index.similarities(query), expected)
+    assert index.ranked(query).tolist() == [1, 0]
+
+def test_ranked_breaks_ties_in_index_order():
+    index = FieldIndex(["Data Science", "Computer Science", "Political Science"])
+    assert index.ranked("Science").tolist() == [0, 1, 2]
+    # A query made only of unit words or unknown words matches nothing
+    assert index.ranked("Department of").tolist() == []
+    assert index.ranked("Music").tolist() == []
+    assert not index.similarities("Music").any()
+
+def test_unmatched_students_go_to_the_most_similar_field():
+    students = pd.DataFrame({
+        "name": ["Ada", "Alan", "Grace", "Linus"],
+        "matric number": ["1", "2", "3", "4"],
+        "field": ["Dept. of Computer Science", "Computer Engineering", "CS", "Music"],
+    })
+    lecturers = pd.DataFrame({
+        "name": ["Dr. Knuth", "Dr. Curie"],
+        "field": ["Computer Science", "Physics"],
+        "max_students": [10, 10],
+    })
+    result = assign_students(students, lecturers, "field", seed=0)
+    placed = dict(zip(result["student name"], result["assigned lecturer"]))
+    # Synonym and unit-word spellings match exactly; "Computer Engineering" shares a token
+    assert placed == {"Ada": "Dr. Knuth", "Grace": "Dr. Knuth", "Alan": "Dr. Knuth"}
+    assert result.attrs["cross-field"] == 1
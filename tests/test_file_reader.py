@@ -0,0 +1,89 @@
+from io import BytesIO
+
+import docx
+import pandas as pd
+import pytest
+
+from utils.file_reader import read_docx_table
+
+def python_docx_table(file, table_index=0):
+    # The reader read_docx_table replaced: python-docx cells, first row as header
+    table = docx.Document(file).tables[table_index]
+    data = []
+    keys = []
+    for i, row in enumerate(table.rows):
+        text = [cell.text.strip() for cell in row.cells]
+        if i == 0:
+            keys = text
+        else:
+            data.append(dict(zip(keys, text)))
+    return pd.DataFrame(data)
+
+def saved(document):
+    file = BytesIO()
+    document.save(file)
+    return file
+
+def roster_document():
+    document = docx.Document()
+    document.add_paragraph("Student roster")
+    table = document.add_table(rows=6, cols=4)
+    header = ["Student Name", "Matric Number", "Field", "Notes"]
+    for cell, text in zip(table.rows[0].cells, header):
+        cell.text = text
+    for r in range(1, 6):
+        for c, cell in enumerate(table.rows[r].cells):
+            cell.text = f" r{r}c{c} "
+
+    # Horizontal merge across field and notes
+    table.cell(1, 2).merge(table.cell(1, 3))
+    # Vertical merge down the field column
+    table.cell(2, 2).merge(table.cell(4, 2))
+    # Block merge over two rows and two columns
+    table.cell(4, 0).merge(table.cell(5, 1))
+
+    # Nested table whose text python-docx leaves out of the cell
+    nested = table.cell(3, 3).add_table(rows=2, cols=2)
+    nested.cell(0, 0).text = "inner"
+    nested.cell(1, 1).text = "deeper"
+
+    # Several paragraphs, a tab and a line break in one cell
+    cell = table.cell(5, 3)
+    cell.text = "first"
+    paragraph = cell.add_paragraph()
+    paragraph.add_run("second\tpart")
+    paragraph.add_run().add_break()
+    paragraph.add_run("third ")
+
+    document.add_paragraph("Lecturers")
+    second = document.add_table(rows=2, cols=2)
+    second.cell(0, 0).text = "Lecturer"
+    second.cell(0, 1).text = "Field"
+    second.cell(1, 0).text = "Dr. Hopper"
+    second.cell(1, 1).merge(second.cell(1, 0))
+    return document
+
+@pytest.mark.parametrize("table_index", [0, 1])
+def test_docx_reader_matches_python_docx(table_index):
+    file = saved(roster_document())
+    expected = python_docx_table(file, table_index)
+    file.seek(0)
+    pd.testing.assert_frame_equal(read_docx_table(file, table_index), expected)
+
+def test_docx_reader_keeps_last_duplicate_header():
+    document = docx.Document()
+    table = document.add_table(rows=2, cols=3)
+    for cell, text in zip(table.rows[0].cells, ["Name", "Field", "Name"]):
+        cell.text = text
+    for cell, text in zip(table.rows[1].cells, ["Ada", "AI", "Lovelace"]):
+        cell.text = text
+    file = saved(document)
+    expected = python_docx_table(file)
+    file.seek(0)
+    pd.testing.assert_frame_equal(read_docx_table(file), expected)
+
+def test_docx_reader_without_tables():
+    document = docx.Document()
+    document.add_paragraph("No tables here")
+    with pytest.raises(ValueError, match="does not contain any tables"):
+        read_docx_table(saved(document))
@@ -0,0 +1,162 @@
+import itertools
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.assigner import assign_students
+from utils.flow import MinCostFlow
+
+def bellman_ford_flow(n_nodes, edges, source, sink, limit=float("inf")):
+    """
+    Reference solver: successive shortest paths found with Bellman-Ford,
+    one augmenting path at a time.
+    """
+    residual = {}
+    graph = [[] for _ in range(n_nodes)]
+    for u, v, cap, cost in edges:
+        graph[u].append((v, cost, len(residual)))
+        residual[len(residual)] = cap
+        graph[v].append((u, -cost, len(residual)))
+        residual[len(residual)] = 0
+    total_flow = total_cost = 0
+    while total_flow < limit:
+        dist = [float("inf")] * n_nodes
+        via = [None] * n_nodes
+        dist[source] = 0
+        for _ in range(n_nodes):
+            for u in range(n_nodes):
+                for v, cost, e in graph[u]:
+                    if residual[e] > 0 and dist[u] + cost < dist[v]:
+                        dist[v] = dist[u] + cost
+                        via[v] = (u, e)
+        if dist[sink] == float("inf"):
+            break
+        path = []
+        v = sink
+        while v != source:
+            u, e = via[v]
+            path.append(e)
+            v = u
+        amount = min([limit - total_flow] + [residual[e] for e in path])
+        for e in path:
+            residual[e] -= amount
+            residual[e ^ 1] += amount
+        total_flow += amount
+        total_cost += amount * dist[sink]
+    return total_flow, total_cost
+
+def test_flow_takes_the_cheaper_route_first():
+    graph = MinCostFlow(4)
+    cheap = graph.add_edge(0, 1, 2, 1)
+    graph.add_edge(1, 3, 2, 1)
+    dear = graph.add_edge(0, 2, 5, 4)
+    graph.add_edge(2, 3, 5, 4)
+    assert graph.flow(0, 3, 3) == (3, 2 * 2 + 1 * 8)
+    assert graph.edge_flow(cheap) == 2
+    assert graph.edge_flow(dear) == 1
+
+def test_flow_stops_at_the_smallest_cut():
+    # 10 units are asked for but the middle edges only carry 3
+    graph = MinCostFlow(4)
+    graph.add_edge(0, 1, 10, 0)
+    graph.add_edge(1, 2, 2, 1)
+    graph.add_edge(1, 2, 1, 5)
+    graph.add_edge(2, 3, 10, 0)
+    assert graph.flow(0, 3, 10) == (3, 2 + 5)
+
+def test_flow_without_a_path():
+    graph = MinCostFlow(3)
+    graph.add_edge(0, 1, 4, 1)
+    assert graph.flow(0, 2) == (0, 0)
+
+def test_flow_matches_bellman_ford_on_small_graphs():
+    rng = random.Random(4)
+    for _ in range(150):
+        n_nodes = rng.randint(2, 8)
+        edges = [(*rng.sample(range(n_nodes), 2), rng.randint(1, 5), rng.randint(0, 9)) for _ in range(rng.randint(1, 20))]
+        limit = rng.choice([float("inf"), rng.randint(1, 8)])
+        graph = MinCostFlow(n_nodes)
+        ids = [graph.add_edge(*edge) for edge in edges]
+        assert graph.flow(0, n_nodes - 1, limit) == bellman_ford_flow(n_nodes, edges, 0, n_nodes - 1, limit)
+
+        # Edge flows stay within capacity and balance at every inner node
+        balance = np.zeros(n_nodes, dtype=int)
+        for edge, (u, v, cap, _) in zip(ids, edges):
+            assert 0 <= graph.edge_flow(edge) <= cap
+            balance[u] -= graph.edge_flow(edge)
+            balance[v] += graph.edge_flow(edge)
+        assert not balance[1:-1].any()
+
+def exhaustive_cost(students, lecturers):
+    """
+    Cheapest total cost of assign_optimal's objective found by trying every
+    assignment: the preference rank, the rank count for a lecturer in the
+    student's field, two more for anyone else, plus one per student beyond
+    a lecturer's fair share.
+    """
+    names = lecturers["name"].tolist()
+    ranked = [[n for n in str(p).split(";") if n in names] if isinstance(p, str) else [] for p in students["preferences"]]
+    n_ranks = max(map(len, ranked), default=0)
+    fair_share = -(-len(students) // len(lecturers))
+    capacities = lecturers["max_students"].tolist()
+    best = None
+    for choice in itertools.product(range(len(lecturers)), repeat=len(students)):
+        loads = np.bincount(choice, minlength=len(lecturers))
+        if (loads > capacities).any():
+            continue
+        cost = int(np.maximum(loads - fair_share, 0).sum())
+        for s, lecturer in enumerate(choice):
+            if names[lecturer] in ranked[s]:
+                cost += ranked[s].index(names[lecturer])
+            elif students["field"].iloc[s] == lecturers["field"].iloc[lecturer]:
+                cost += n_ranks
+            else:
+                cost += n_ranks + 2
+        best = cost if best is None else min(best, cost)
+    return best
+
+def test_optimal_mode_matches_exhaustive_search():
+    rng = random.Random(18)
+    for _ in range(40):
+        n_lecturers = rng.randint(1, 3)
+        n_students = rng.randint(1, 6)
+        lecturers = pd.DataFrame({
+            "name": [f"Dr. {chr(65 + i)}" for i in range(n_lecturers)],
+            "field": [rng.choice(["AI", "Bio"]) for _ in range(n_lecturers)],
+            "max_students": [rng.randint(1, n_students) for _ in range(n_lecturers)],
+        })
+        if lecturers["max_students"].sum() < n_students:
+            continue
+        students = pd.DataFrame({
+            "name": [f"S{i}" for i in range(n_students)],
+            "matric number": [f"M{i}" for i in range(n_students)],
+            "field": [rng.choice(["AI", "Bio", "Law"]) for _ in range(n_students)],
+            "preferences": [";".join(rng.sample(lecturers["name"].tolist(), rng.randint(0, n_lecturers))) or None for _ in range(n_students)],
+        })
+        result = assign_students(students, lecturers, "optimal", seed=0)
+        assert len(result) == n_students
+        assert result.attrs["total cost"] == exhaustive_cost(students, lecturers)
+        loads = result["assigned lecturer"].value_counts()
+        assert all(loads.get(name, 0) <= cap for name, cap in zip(lecturers["name"], lecturers["max_students"]))
+
+def test_optimal_mode_pays_for_loads_beyond_the_fair_share():
+    # Every placement is free, so only the fair-share penalty separates a 6-0 split from 3-3
+    students = pd.DataFrame({"name": list("abcdef"), "matric number": list("123456"), "field": ["AI"] * 6})
+    lecturers = pd.DataFrame({"name": ["Dr. A", "Dr. B"], "field": ["AI", "AI"], "max_students": [6, 6]})
+    result = assign_students(students, lecturers, "optimal", seed=1)
+    assert result["assigned lecturer"].value_counts().to_dict() == {"Dr. A": 3, "Dr. B": 3}
+    assert result.attrs["total cost"] == 0
+
+    # With room for only two at Dr. B, one student has to go beyond Dr. A's fair share
+    lecturers["max_students"] = [6, 2]
+    result = assign_students(students, lecturers, "optimal", seed=1)
+    assert result["assigned lecturer"].value_counts().to_dict() == {"Dr. A": 4, "Dr. B": 2}
+    assert result.attrs["total cost"] == 1
+
+def test_optimal_mode_rejects_too_few_slots():
+    students = pd.DataFrame({"name": list("abcde"), "matric number": list("12345"), "field": ["AI"] * 5})
+    lecturers = pd.DataFrame({"name": ["Dr. A", "Dr. B"], "field": ["AI", "AI"], "max_students": [2, 2]})
+    with pytest.raises(Exception, match="Not enough lecturer slots"):
+        assign_students(students, lecturers, "optimal")
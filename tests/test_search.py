@@ -0,0 +1,77 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.search import SEARCH_COLUMNS, SearchIndex
+
+ROSTER = pd.DataFrame({
+    "student name": ["Ada Lovelace", "Zoë Ng", "Al", "", "José Ramos", "a"],
+    "matric number": ["CS/01", "cs/02", "X", "CS/04", "ee/05", "A1"],
+    "assigned lecturer": ["Dr. Ng", "Dr. Ng", "Dr. Émile", "Dr. Ng", "Dr. Émile", "Dr. Ng"],
+})
+
+def substring_rows(query):
+    query = query.lower()
+    return [
+        position for position, row in enumerate(ROSTER[SEARCH_COLUMNS].itertuples(index=False))
+        if any(query in value.lower() for value in row)
+    ]
+
+CHARACTERS = sorted(set("".join(ROSTER[SEARCH_COLUMNS].to_numpy().ravel()).lower()))
+SHORT_QUERIES = CHARACTERS + ["".join(pair) for pair in itertools.product(CHARACTERS, repeat=2)]
+
+def test_every_short_query_matches_substring_search():
+    index = SearchIndex(ROSTER)
+    for query in SHORT_QUERIES:
+        assert index.search(query).tolist() == substring_rows(query), query
+        assert index.search(query.upper(), limit=2).tolist() == substring_rows(query)[:2], query
+
+@pytest.mark.parametrize("query, expected", [
+    ("A", [0, 2, 4, 5]),
+    ("ng", [0, 1, 3, 5]),
+    # One character, two UTF-8 bytes: still answered by the scan
+    ("é", [2, 4]),
+    ("ë", [1]),
+    # Two characters but three bytes: answered by the trigram index
+    ("oë", [1]),
+    ("ém", [2, 4]),
+    ("/0", [0, 1, 3, 4]),
+    ("q", []),
+])
+def test_short_queries(query, expected):
+    assert SearchIndex(ROSTER).search(query).tolist() == expected
+
+def test_limit_stops_the_scan():
+    index = SearchIndex(ROSTER)
+    assert index.search("d", limit=1).tolist() == [0]
+    assert index.search("d", limit=0).tolist() == []
+    assert index.search("ng", limit=0).tolist() == []
+    assert index.search("lovelace", limit=0).tolist() == []
+    assert index.search("a1", limit=5).tolist() == [5]
+
+def test_empty_query_returns_the_first_rows():
+    index = SearchIndex(ROSTER)
+    assert index.search("").tolist() == list(range(len(ROSTER)))
+    assert index.search("", limit=2).tolist() == [0, 1]
+    assert index.search("", limit=100).tolist() == list(range(len(ROSTER)))
+
+def test_missing_values_are_empty_keys():
+    df = pd.DataFrame({
+        "student name": ["Ada Lovelace", np.nan, "Alan Turing"],
+        "matric number": ["CS/001", "CS/002", np.nan],
+        "assigned lecturer": ["Dr. Nan", "Dr. Hopper", "Dr. Hopper"],
+    })
+    index = SearchIndex(df)
+    assert index.search("nan").tolist() == [0]
+    assert index.search("na").tolist() == [0]
+    assert index.search("hopper", limit=1).tolist() == [1]
+    assert index.search("cs/00").tolist() == [0, 1]
+
+def test_roster_without_trigrams():
+    # Keys this short have no trigram inside a single cell
+    index = SearchIndex(pd.DataFrame({column: ["a", "bc"] for column in SEARCH_COLUMNS}))
+    assert index.search("a").tolist() == [0]
+    assert index.search("bc").tolist() == [1]
+    assert index.search("abc").tolist() == []
@@ -1,109 +1,445 @@
-import random
+import numpy as np
 import pandas as pd
+from utils.fields import FieldIndex, field_key
+from utils.flow import MinCostFlow
+from utils.model import ASSIGNMENT_COLUMNS, Assignment
+from utils.scheduler import CapacityScheduler
 
-def assign_students(student_df, lecturer_df, mode="random", max_per_lecturer=None):
+def assign_students(student_df, lecturer_df, mode="random", max_per_lecturer=None, seed=None, previous=None, trials=None,
+                    progress=None):
     """
     Assigns students to lecturers based on the selected mode.
     :param student_df: DataFrame with student data
     :param lecturer_df: DataFrame with lecturer data
-    :param mode: "random" or "field"
+    :param mode: "random", "field", "optimal" or "best" (best of several random trials)
     :param max_per_lecturer: maximum number of students per lecturer
+    :param seed: optional seed or numpy Generator for reproducible assignment
+    :param previous: optional earlier assignment (DataFrame or Assignment) whose pairings are kept
+    :param trials: number of trials for the "best" mode
+    :param progress: optional callback progress(stage, done, total), called as fields or trial blocks finish
     :return: DataFrame with assignments
     """
+    return assign(student_df, lecturer_df, mode, max_per_lecturer, seed, previous, trials, progress).frame
+
+def assign(student_df, lecturer_df, mode="random", max_per_lecturer=None, seed=None, previous=None, trials=None,
+           progress=None):
+    """
+    Same as assign_students but returns the columnar utils.model.Assignment,
+    leaving the DataFrame to be built only if it is needed.
+    """
+    if previous is not None:
+        return assign_incremental(previous, student_df, lecturer_df, mode, max_per_lecturer, seed=seed, progress=progress)
+    if mode == "best":
+        from utils.trials import assign_best_of
+        return assign_best_of(student_df, lecturer_df, trials or 200, max_per_lecturer, seed=seed, progress=progress)
     if mode == "field":
-        return assign_by_field(student_df, lecturer_df, max_per_lecturer)
+        return assign_by_field(student_df, lecturer_df, max_per_lecturer, seed=seed, progress=progress)
+    elif mode == "optimal":
+        return assign_optimal(student_df, lecturer_df, max_per_lecturer, seed=seed)
     else:
-        return assign_random(student_df, lecturer_df, max_per_lecturer)
-
-def assign_random(student_df, lecturer_df, max_per_lecturer=None):
-    students = student_df.copy()
-    lecturers = lecturer_df.copy()
-    lecturer_names = lecturers["name"].tolist()
-    assignments = {lecturer: [] for lecturer in lecturer_names}
-
-    if max_per_lecturer is None:
-        max_per_lecturer = len(students) // len(lecturer_names) + 1
-
-    student_indices = list(students.index)
-    random.shuffle(student_indices)
-
-    for student_idx in student_indices:
-        assigned = False
-        random.shuffle(lecturer_names)
-
-        for lecturer in lecturer_names:
-            if len(assignments[lecturer]) < max_per_lecturer:
-                assignments[lecturer].append(student_idx)
-                assigned = True
-                break
-
-        if not assigned:
-            raise Exception("Not enough lecturer slots to assign all students.")
-
-    # Flatten the assignment into a DataFrame, including student and lecturer fields if present
-    records = []
-    for lecturer, indices in assignments.items():
-        # Get lecturer field if present
-        lecturer_field = ''
-        if "field" in lecturers.columns:
-            match = lecturers[lecturers["name"] == lecturer]
-            if not match.empty:
-                lecturer_field = match.iloc[0]["field"]
-        for idx in indices:
-            student = students.loc[idx]
-            record = {
-                "assigned lecturer": lecturer,
-                "lecturer field": lecturer_field,
-                "student name": student.get("name", ""),
-                "matric number": student.get("matric number", ""),
-                "student field": student.get("field", "")
-            }
-            records.append(record)
-
-    return pd.DataFrame(records)
-
-def assign_by_field(student_df, lecturer_df, max_per_lecturer=None):
-    students = student_df.copy()
-    lecturers = lecturer_df.copy()
+        return assign_random(student_df, lecturer_df, max_per_lecturer, seed=seed)
+
+def lecturer_capacities(lecturer_df, max_per_lecturer=None, default=None):
+    """
+    Resolves the number of slots for each lecturer. A valid 'max_students'
+    value in the lecturer file wins, then the global maximum, then the
+    default (None means unlimited). Returns a float array (np.inf = no limit).
+    """
+    fallback = max_per_lecturer if max_per_lecturer is not None else default
+    fallback = np.inf if fallback is None else int(fallback)
+    capacities = np.full(len(lecturer_df), fallback, dtype=float)
+    if "max_students" in lecturer_df.columns:
+        per_lecturer = pd.to_numeric(lecturer_df["max_students"], errors="coerce").to_numpy(dtype=float)
+        valid = np.isfinite(per_lecturer) & (per_lecturer > 0)
+        capacities[valid] = np.floor(per_lecturer[valid])
+    return capacities
+
+def assign_random(student_df, lecturer_df, max_per_lecturer=None, seed=None):
+    n_students = len(student_df)
+    n_lecturers = len(lecturer_df)
+
+    default = n_students // max(n_lecturers, 1) + 1
+    capacities = lecturer_capacities(lecturer_df, max_per_lecturer, default)
+    rng = np.random.default_rng(seed)
+    student_pos, lecturer_pos = _random_positions(n_students, capacities, rng)
+
+    # Keep rows grouped by lecturer, in lecturer file order
+    order = np.argsort(lecturer_pos, kind="stable")
+    return Assignment(student_df, lecturer_df, student_pos[order], lecturer_pos[order])
+
+def _random_positions(n_students, capacities, rng, loads=None):
+    """
+    Spreads n_students over the lecturers' free slots, least-loaded first.
+    Returns parallel arrays of student and lecturer positions.
+    """
+    if loads is None:
+        loads = np.zeros(len(capacities), dtype=int)
+    if (capacities - loads).sum() < n_students:
+        raise Exception("Not enough lecturer slots to assign all students.")
+    student_pos = rng.permutation(n_students)
+    lecturer_pos = CapacityScheduler(capacities, rng, loads=loads).take(n_students)
+    return student_pos, lecturer_pos
+
+def _group_positions(codes, n_groups):
+    """
+    Groups row positions by integer code in one pass. Returns the positions
+    sorted by code (stable) and the start offset of each group.
+    """
+    valid = np.flatnonzero(codes >= 0)
+    order = valid[np.argsort(codes[valid], kind="stable")]
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes[valid], minlength=n_groups))))
+    return order, offsets
+
+def _field_codes(student_df, lecturer_df):
+    """
+    Shared categorical codes for both files, in order of first appearance
+    among students. Spellings with the same normalized key (case, unit
+    words such as "Department of", abbreviations) share a code; each code
+    is named after its first spelling.
+    """
+    raw_codes, raw_fields = pd.factorize(pd.concat([student_df["field"], lecturer_df["field"]], ignore_index=True))
+    key_codes, _ = pd.factorize(pd.Index([field_key(f) for f in raw_fields], dtype=object))
+    codes = np.where(raw_codes >= 0, key_codes[raw_codes] if len(key_codes) else -1, -1)
+    fields = raw_fields[np.unique(key_codes, return_index=True)[1]]
+    return codes[:len(student_df)], codes[len(student_df):], fields
+
+def assign_by_field(student_df, lecturer_df, max_per_lecturer=None, seed=None, fallback=True, progress=None):
+    """
+    Assigns students within their field, least-loaded lecturer first.
+    Field names are compared after normalization (utils.fields.field_key).
+    With fallback, students without a lecturer in their field, or beyond
+    its capacity, go to the most similar field with room;
+    attrs["cross-field"] counts them. progress(stage, done, total) is
+    called after each field.
+    """
+    students = student_df
+    lecturers = lecturer_df
     # Normalize and check that both have a 'field' column
     if "field" not in students.columns or "field" not in lecturers.columns:
         raise ValueError("Both student and lecturer files must include a 'Field' column for field-based assignment.")
 
-    assignments = []
-
-    for field in students["field"].unique():
-        students_in_field = students[students["field"] == field]
-        lecturers_in_field = lecturers[lecturers["field"] == field]
-
-        if lecturers_in_field.empty:
-            continue  # No lecturer in this field
-
-        lecturer_list = lecturers_in_field["name"].tolist()
-        lecturer_capacity = {name: 0 for name in lecturer_list}
-
-        for _, student in students_in_field.iterrows():
-            random.shuffle(lecturer_list)
-            assigned = False
-
-            for lecturer in lecturer_list:
-                if max_per_lecturer is None or lecturer_capacity[lecturer] < max_per_lecturer:
-                    # Get lecturer field if present
-                    lecturer_field = ''
-                    match = lecturers_in_field[lecturers_in_field["name"] == lecturer]
-                    if not match.empty:
-                        lecturer_field = match.iloc[0]["field"]
-                    assignments.append({
-                        "assigned lecturer": lecturer,
-                        "lecturer field": lecturer_field,
-                        "student name": student.get("name", ""),
-                        "matric number": student.get("matric number", ""),
-                        "student field": student.get("field", "")
-                    })
-                    lecturer_capacity[lecturer] += 1
-                    assigned = True
-                    break
+    capacities = lecturer_capacities(lecturers, max_per_lecturer)
+    rng = np.random.default_rng(seed)
+    student_pos, lecturer_pos, cross_field = _field_positions(students, lecturers, capacities, rng, fallback=fallback, progress=progress)
+    return Assignment(students, lecturers, student_pos, lecturer_pos, {"cross-field": cross_field})
+
+def _field_positions(students, lecturers, capacities, rng, loads=None, fallback=True, progress=None):
+    """
+    Places each student with the least-loaded lecturer of their field.
+    With fallback, students whose field has no lecturer, or whose field
+    is full, go to the most similar field (see utils.fields) that still
+    has room; students with no similar field are left out. Returns
+    parallel arrays of student and lecturer positions, grouped by field,
+    and the number of cross-field placements.
+    """
+    if loads is None:
+        loads = np.zeros(len(lecturers), dtype=int)
+    student_codes, lecturer_codes, fields = _field_codes(students, lecturers)
+    student_order, student_offsets = _group_positions(student_codes, len(fields))
+    lecturer_order, lecturer_offsets = _group_positions(lecturer_codes, len(fields))
 
-            if not assigned:
+    schedulers = {}
+    def scheduler_for(code):
+        # One scheduler per field, shared by the exact and fallback stages
+        if code not in schedulers:
+            field_lecturers = lecturer_order[lecturer_offsets[code]:lecturer_offsets[code + 1]]
+            schedulers[code] = (field_lecturers, CapacityScheduler(capacities[field_lecturers], rng, loads=loads[field_lecturers]))
+        return schedulers[code]
+
+    student_parts = []
+    lecturer_parts = []
+    unplaced = []
+    for code, field in enumerate(fields):
+        if progress is not None:
+            progress("assigning field", code, len(fields))
+        field_students = student_order[student_offsets[code]:student_offsets[code + 1]]
+        if len(field_students) == 0:
+            continue
+        if lecturer_offsets[code] == lecturer_offsets[code + 1]:
+            unplaced.append((code, field_students))  # No lecturer in this field
+            continue
+
+        field_lecturers, scheduler = scheduler_for(code)
+        picks = scheduler.take(len(field_students))
+        if len(picks) < len(field_students):
+            if not fallback:
+                student = students.iloc[field_students[len(picks)]]
                 raise Exception(f"No available lecturer slots for student '{student['name']}' in field '{field}'.")
+            unplaced.append((code, field_students[len(picks):]))
+            field_students = field_students[:len(picks)]
+        picks = field_lecturers[rng.permutation(picks)]
+
+        student_parts.append(field_students)
+        lecturer_parts.append(picks)
+
+    cross_field = 0
+    if fallback and unplaced:
+        # Rank the staffed fields once per unplaced field, never per student
+        staffed = np.flatnonzero(np.diff(lecturer_offsets) > 0)
+        index = FieldIndex(fields[staffed])
+        for code, waiting in unplaced:
+            for neighbour in staffed[index.ranked(fields[code])]:
+                if len(waiting) == 0:
+                    break
+                if neighbour == code:
+                    continue
+                field_lecturers, scheduler = scheduler_for(neighbour)
+                picks = scheduler.take(len(waiting))
+                student_parts.append(waiting[:len(picks)])
+                lecturer_parts.append(field_lecturers[rng.permutation(picks)])
+                cross_field += len(picks)
+                waiting = waiting[len(picks):]
+            if len(waiting) and lecturer_offsets[code] < lecturer_offsets[code + 1]:
+                student = students.iloc[waiting[0]]
+                raise Exception(f"No available lecturer slots for student '{student['name']}' in field '{fields[code]}'.")
+
+    if progress is not None:
+        progress("assigning field", len(fields), len(fields))
+    student_pos = np.concatenate(student_parts) if student_parts else np.array([], dtype=int)
+    lecturer_pos = np.concatenate(lecturer_parts) if lecturer_parts else np.array([], dtype=int)
+    return student_pos, lecturer_pos, cross_field
+
+def _preference_lists(student_df, lecturer_index):
+    """
+    Parses the optional 'preferences' column (lecturer names separated by
+    ';') into tuples of lecturer positions, most preferred first. Unknown
+    names are ignored.
+    """
+    if "preferences" not in student_df.columns:
+        return [()] * len(student_df)
+    parsed = []
+    for value in student_df["preferences"].tolist():
+        ranked = []
+        if isinstance(value, str):
+            for name in value.split(";"):
+                idx = lecturer_index.get(name.strip())
+                if idx is not None and idx not in ranked:
+                    ranked.append(idx)
+        parsed.append(tuple(ranked))
+    return parsed
+
+def assign_optimal(student_df, lecturer_df, max_per_lecturer=None, seed=None):
+    """
+    Minimum-cost assignment over a sparse bipartite graph. A student costs
+    its preference rank with a lecturer they listed, the number of ranks
+    with another lecturer in their field, and two more than that with any
+    other lecturer (routed through a single overflow node so the graph
+    stays sparse). Students beyond a lecturer's fair share cost one extra,
+    which keeps loads even. Students with identical options are solved as
+    one node and spread over the resulting counts afterwards.
+    The result carries attrs["total cost"] and attrs["satisfaction"] (1.0
+    means everyone got their cheapest option).
+    """
+    n_students = len(student_df)
+    capacities = lecturer_capacities(lecturer_df, max_per_lecturer)
+    if n_students == 0:
+        return Assignment(student_df, lecturer_df, [], [])
+
+    rng = np.random.default_rng(seed)
+    student_pos, lecturer_pos, student_costs, total_cost, worst_cost = _optimal_positions(student_df, lecturer_df, capacities, rng)
+    order = np.argsort(lecturer_pos, kind="stable")
+    return Assignment(student_df, lecturer_df, student_pos[order], lecturer_pos[order], {
+        "total cost": int(total_cost),
+        "satisfaction": float(1 - student_costs.sum() / (worst_cost * n_students)),
+    })
+
+def _optimal_positions(student_df, lecturer_df, capacities, rng, loads=None):
+    """
+    Solves the min-cost flow behind assign_optimal. `capacities` are the
+    free slots per lecturer and `loads` the students they already have,
+    which count towards the fair share. Returns parallel arrays of student
+    positions, lecturer positions and per-student costs, plus the total
+    cost and the cost of an overflow placement.
+    """
+    n_students = len(student_df)
+    n_lecturers = len(lecturer_df)
+    if loads is None:
+        loads = np.zeros(n_lecturers, dtype=int)
+    capacities = np.minimum(capacities, n_students).astype(int)
+    if capacities.sum() < n_students:
+        raise Exception("Not enough lecturer slots to assign all students.")
+
+    lecturer_names = lecturer_df["name"].tolist()
+    lecturer_index = {name: i for i, name in enumerate(lecturer_names)}
+    preferences = _preference_lists(student_df, lecturer_index)
+    n_ranks = max((len(p) for p in preferences), default=0)
+    field_cost = n_ranks
+    overflow_cost = n_ranks + 2
+
+    if "field" in student_df.columns and "field" in lecturer_df.columns:
+        student_codes, lecturer_codes, _ = _field_codes(student_df, lecturer_df)
+    else:
+        student_codes = np.full(n_students, -1)
+        lecturer_codes = np.full(n_lecturers, -1)
+    lecturers_by_field = {}
+    for idx, code in enumerate(lecturer_codes.tolist()):
+        if code >= 0:
+            lecturers_by_field.setdefault(code, []).append(idx)
+
+    # Collapse students with the same field and preference list into one node
+    type_keys, student_types = pd.factorize(pd.Series(list(zip(student_codes.tolist(), preferences))))
+    type_sizes = np.bincount(type_keys, minlength=len(student_types))
+
+    source, sink, overflow = 0, 1, 2
+    first_type = 3 + n_lecturers
+    graph = MinCostFlow(first_type + len(student_types))
+    fair_share = -(-(n_students + int(loads.sum())) // max(n_lecturers, 1))
+    for idx in range(n_lecturers):
+        node = 3 + idx
+        graph.add_edge(overflow, node, n_students, 0)
+        fair = min(max(fair_share - int(loads[idx]), 0), capacities[idx])
+        graph.add_edge(node, sink, fair, 0)
+        if capacities[idx] > fair:
+            graph.add_edge(node, sink, capacities[idx] - fair, 1)
+
+    type_edges = []
+    for t, (code, ranked) in enumerate(student_types):
+        node = first_type + t
+        size = int(type_sizes[t])
+        graph.add_edge(source, node, size, 0)
+        edges = []
+        for rank, idx in enumerate(ranked):
+            edges.append((idx, rank, graph.add_edge(node, 3 + idx, size, rank)))
+        for idx in lecturers_by_field.get(code, []):
+            if idx not in ranked:
+                edges.append((idx, field_cost, graph.add_edge(node, 3 + idx, size, field_cost)))
+        edges.append((None, overflow_cost, graph.add_edge(node, overflow, size, overflow_cost)))
+        type_edges.append(edges)
+
+    flow, total_cost = graph.flow(source, sink, n_students)
+    if flow < n_students:
+        raise Exception("Not enough lecturer slots to assign all students.")
+
+    # Overflow placements can go to any lecturer the overflow node fed
+    overflow_edges = [e for e in graph.adj[overflow] if e % 2 == 0]
+    overflow_pool = np.repeat(
+        [graph.to[e] - 3 for e in overflow_edges],
+        [graph.edge_flow(e) for e in overflow_edges],
+    )
+    overflow_used = 0
+
+    type_order = np.argsort(type_keys, kind="stable")
+    type_offsets = np.concatenate(([0], np.cumsum(type_sizes)))
+    student_parts = []
+    lecturer_parts = []
+    cost_parts = []
+    for t, edges in enumerate(type_edges):
+        members = rng.permutation(type_order[type_offsets[t]:type_offsets[t + 1]])
+        for idx, cost, edge in edges:
+            count = graph.edge_flow(edge)
+            if count == 0:
+                continue
+            if idx is None:
+                picks = overflow_pool[overflow_used:overflow_used + count]
+                overflow_used += count
+            else:
+                picks = np.full(count, idx)
+            student_parts.append(members[:count])
+            lecturer_parts.append(picks)
+            cost_parts.append(np.full(count, cost))
+            members = members[count:]
+
+    student_pos = np.concatenate(student_parts)
+    lecturer_pos = np.concatenate(lecturer_parts)
+    student_costs = np.concatenate(cost_parts)
+    return student_pos, lecturer_pos, student_costs, total_cost, overflow_cost
+
+def _key_positions(keys, lookup):
+    """
+    Positions of `keys` within `lookup` (first occurrence wins), -1 where a
+    key is absent. Values are compared as stripped strings so a matric
+    number read as 1234 still matches "1234".
+    """
+    index = pd.Index(_compare_keys(lookup, "matric number"))
+    first = ~index.duplicated()
+    positions = pd.Series(np.flatnonzero(first), index=index[first])
+    return positions.reindex(_compare_keys(keys, "matric number")).fillna(-1).to_numpy(dtype=int)
+
+def assign_incremental(previous, student_df, lecturer_df, mode="random", max_per_lecturer=None, seed=None, progress=None):
+    """
+    Updates a previous assignment for a changed roster instead of starting
+    over. Students and lecturers are matched on matric number and lecturer
+    name; every pairing whose student and lecturer are both still present
+    (and, in field mode, still share a field unless the student's field has
+    no lecturer) is kept. New students and
+    students whose lecturer left or is over capacity are placed into the
+    remaining slots with the chosen mode's rules.
+    The result carries attrs["kept"], attrs["placed"] and
+    attrs["changed lecturers"]: the lecturers whose group differs from the
+    previous assignment, i.e. the only reports that need re-rendering.
+    """
+    n_students = len(student_df)
+    n_lecturers = len(lecturer_df)
+    student_of_row = _key_positions(_result_column(previous, "matric number"), student_df["matric number"])
+    lecturer_of_row = _key_positions(_result_column(previous, "assigned lecturer"), lecturer_df["name"])
+
+    keep = (student_of_row >= 0) & (lecturer_of_row >= 0)
+    keep &= ~pd.Series(student_of_row).duplicated().to_numpy()
+    if mode == "field" and "field" in student_df.columns and "field" in lecturer_df.columns:
+        student_codes, lecturer_codes, _ = _field_codes(student_df, lecturer_df)
+        rows = np.flatnonzero(keep)
+        field = student_codes[student_of_row[rows]]
+        # Cross-field placements stay while the student's own field has no lecturer
+        staffed = np.isin(field, lecturer_codes)
+        keep[rows[(field < 0) | (staffed & (field != lecturer_codes[lecturer_of_row[rows]]))]] = False
+
+    if mode == "random":
+        capacities = lecturer_capacities(lecturer_df, max_per_lecturer, n_students // max(n_lecturers, 1) + 1)
+    else:
+        capacities = lecturer_capacities(lecturer_df, max_per_lecturer)
+    # Lecturers whose limit dropped keep their earliest students only
+    kept_rows = np.flatnonzero(keep)
+    rank = pd.Series(lecturer_of_row[kept_rows]).groupby(lecturer_of_row[kept_rows]).cumcount().to_numpy()
+    kept_rows = kept_rows[rank < capacities[lecturer_of_row[kept_rows]]]
+    kept_students = student_of_row[kept_rows]
+    kept_lecturers = lecturer_of_row[kept_rows]
+    loads = np.bincount(kept_lecturers, minlength=n_lecturers)
+
+    pending = np.setdiff1d(np.arange(n_students), kept_students)
+    pending_df = student_df.iloc[pending]
+    rng = np.random.default_rng(seed)
+    if len(pending) == 0:
+        placed_students, placed_lecturers = pending, pending
+    elif mode == "field":
+        placed_students, placed_lecturers, _ = _field_positions(pending_df, lecturer_df, capacities, rng, loads=loads, progress=progress)
+    elif mode == "optimal":
+        placed_students, placed_lecturers, _, _, _ = _optimal_positions(pending_df, lecturer_df, capacities - loads, rng, loads=loads)
+    else:
+        placed_students, placed_lecturers = _random_positions(len(pending), capacities, rng, loads=loads)
+
+    # Kept rows stay in their previous order ahead of new placements
+    student_pos = np.concatenate([kept_students, pending[placed_students]]).astype(int)
+    lecturer_pos = np.concatenate([kept_lecturers, placed_lecturers]).astype(int)
+    order = np.argsort(lecturer_pos, kind="stable")
+    result = Assignment(student_df, lecturer_df, student_pos[order], lecturer_pos[order])
+    result.attrs["kept"] = int(len(kept_rows))
+    result.attrs["placed"] = int(len(placed_students))
+    result.attrs["changed lecturers"] = _changed_lecturers(previous, result)
+    return result
+
+def _result_column(result, name):
+    # A column of an assignment given either as a DataFrame or as an Assignment
+    if isinstance(result, Assignment):
+        return pd.Series(result.column(name))
+    return result[name].reset_index(drop=True)
+
+def _changed_lecturers(previous, current):
+    # Lecturers with any row added, removed or edited between the two assignments.
+    # Cells are compared as normalized text, so a previous run read back from a
+    # report (blank for NaN, matric numbers as text) does not count as a change
+    columns = [c for c in ASSIGNMENT_COLUMNS if isinstance(previous, Assignment) or c in previous.columns]
+    before = set(zip(*(_compare_keys(_result_column(previous, c), c) for c in columns)))
+    after = set(zip(*(_compare_keys(_result_column(current, c), c) for c in columns)))
+    position = columns.index("assigned lecturer")
+    changed = {row[position] for row in before ^ after}
+    names = pd.concat([_result_column(previous, "assigned lecturer"), _result_column(current, "assigned lecturer")], ignore_index=True)
+    names = pd.Series(names[names.notna()].unique())
+    keys = _compare_keys(names, "assigned lecturer")
+    return sorted(str(name) for name, key in zip(names, keys) if key in changed)
 
-    return pd.DataFrame(assignments)
+def _compare_keys(values, column):
+    # Stripped text with blanks for missing values; fields by their normalized key
+    text = values.astype(str).where(values.notna(), "").str.strip()
+    if column in ("lecturer field", "student field"):
+        text = text.map(field_key)
+    return text
@@ -0,0 +1,56 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by the total size of its
+    entries (in bytes) and by the number of entries. Entries larger than the
+    whole budget are not stored.
+    """
+
+    def __init__(self, max_bytes, max_entries=64):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        with self._lock:
+            if key in self._entries:
+                self._size -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._size += size
+            while self._size > self.max_bytes or len(self._entries) > self.max_entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+def frame_fingerprint(df):
+    """
+    Stable content hash of a DataFrame (column names, values and dtypes),
+    used to key caches that depend on an assignment.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr([(str(c), str(t)) for c, t in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
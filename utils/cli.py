@@ -0,0 +1,118 @@
+"""
+Headless batch mode. Example:
+
+    python -m utils.cli assign --students sci.csv --lecturers sci_staff.csv \
+        --students arts.xlsx --lecturers arts_staff.xlsx --mode field --formats pdf,xlsx
+
+Each --students file is paired with the --lecturer file in the same
+position. Streamlit is never imported.
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from utils.pipeline import FORMAT_ALIASES, run_cohort
+from utils.store import DEFAULT_STORE_PATH, open_store
+
+def _parse_formats(value):
+    formats = []
+    for name in value.split(","):
+        name = name.strip().lower()
+        if name not in FORMAT_ALIASES:
+            raise argparse.ArgumentTypeError(f"Unsupported format: {name}")
+        formats.append(FORMAT_ALIASES[name])
+    return formats
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m utils.cli", description="Student–lecturer assignment without the web app.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    assign = commands.add_parser("assign", help="Assign one or more cohorts and write their reports.")
+    assign.add_argument("--students", action="append", required=True, help="Student file (CSV, XLSX or DOCX). Repeat for several cohorts.")
+    assign.add_argument("--lecturers", action="append", required=True, help="Lecturer file paired with the --students file in the same position.")
+    assign.add_argument("--mode", choices=["random", "field", "optimal", "best"], default="random")
+    assign.add_argument("--trials", type=int, default=200, help="Random trials to score in --mode best.")
+    assign.add_argument("--formats", type=_parse_formats, default=["pdf"], help="Comma-separated: pdf, pdf-canvas (drawn straight onto the page, faster for large rosters), word/docx, csv, excel/xlsx.")
+    assign.add_argument("--max-per-lecturer", type=int, default=None)
+    assign.add_argument("--seed", type=int, default=None)
+    assign.add_argument("--output-dir", default="reports", help="Each cohort writes into a subfolder named after its student file.")
+    assign.add_argument("--split", action="store_true", help="Write one report per lecturer.")
+    assign.add_argument("--zip", action="store_true", help="Write a single ZIP per cohort instead of loose files.")
+    assign.add_argument("--diagnostics", action="store_true", help="Include per-stage times in each summary line.")
+    assign.add_argument("--memory", action="store_true", help="With --diagnostics, also trace peak memory per stage (slows every stage down).")
+    assign.add_argument("--jobs", type=int, default=1, help="Cohorts to process in parallel.")
+    assign.add_argument("--previous", action="append", default=None, help="Earlier assignment report (CSV/XLSX) to update instead of reassigning; one per cohort.")
+    assign.add_argument("--store", default=None, help="SQLite run store to save each cohort's assignment in.")
+    lookup = commands.add_parser("lookup", help="Find a student in the runs saved in a run store.")
+    lookup.add_argument("--store", default=DEFAULT_STORE_PATH)
+    lookup.add_argument("--matric", required=True, help="Matric number to look up.")
+    return parser
+
+def _cohort_dirs(student_paths, output_dir):
+    dirs = []
+    for path in student_paths:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = stem
+        n = 2
+        while os.path.join(output_dir, name) in dirs:
+            name = f"{stem}-{n}"
+            n += 1
+        dirs.append(os.path.join(output_dir, name))
+    return dirs
+
+def _run(kwargs):
+    try:
+        return run_cohort(**kwargs), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "lookup":
+        for record in open_store(args.store).find_student(args.matric).to_dict("records"):
+            print(json.dumps(record, default=str))
+        return 0
+    if len(args.students) != len(args.lecturers):
+        print("Each --students file needs a matching --lecturers file.", file=sys.stderr)
+        return 2
+    if args.previous is not None and len(args.previous) != len(args.students):
+        print("Give one --previous file per cohort.", file=sys.stderr)
+        return 2
+    previous = args.previous or [None] * len(args.students)
+
+    jobs = [
+        dict(
+            students_path=students,
+            lecturers_path=lecturers,
+            output_dir=output_dir,
+            mode=args.mode,
+            formats=args.formats,
+            max_per_lecturer=args.max_per_lecturer,
+            seed=args.seed,
+            split_by_lecturer=args.split,
+            bundle=args.zip,
+            diagnostics=args.diagnostics,
+            track_memory=args.memory,
+            previous_path=previous_path,
+            trials=args.trials,
+            store_path=args.store,
+        )
+        for students, lecturers, previous_path, output_dir in zip(args.students, args.lecturers, previous, _cohort_dirs(args.students, args.output_dir))
+    ]
+    if args.jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            results = list(pool.map(_run, jobs))
+    else:
+        results = [_run(job) for job in jobs]
+
+    failed = 0
+    for job, (summary, error) in zip(jobs, results):
+        if error is not None:
+            failed += 1
+            print(json.dumps({"students": job["students_path"], "lecturers": job["lecturers_path"], "error": error}))
+        else:
+            print(json.dumps(summary, default=str))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
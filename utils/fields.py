@@ -0,0 +1,114 @@
+import re
+import numpy as np
+
+# Abbreviations expanded before matching, so "Comp. Sci." finds "Computer Science"
+FIELD_SYNONYMS = {
+    "ai": "artificial intelligence",
+    "ml": "machine learning",
+    "cs": "computer science",
+    "csc": "computer science",
+    "compsci": "computer science",
+    "comp": "computer",
+    "sci": "science",
+    "it": "information technology",
+    "ict": "information communication technology",
+    "eng": "engineering",
+    "engr": "engineering",
+    "mech": "mechanical",
+    "elec": "electrical",
+    "math": "mathematics",
+    "maths": "mathematics",
+    "stat": "statistics",
+    "stats": "statistics",
+    "bio": "biology",
+    "chem": "chemistry",
+    "phys": "physics",
+    "econ": "economics",
+    "mgmt": "management",
+    "admin": "administration",
+}
+
+# Words that only say what kind of unit a value is (the UI accepts
+# department and specialization columns as fields)
+FIELD_STOPWORDS = {
+    "of", "and", "the", "in", "for", "department", "dept", "specialization",
+    "specialisation", "field", "school", "faculty", "studies",
+}
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+def field_tokens(value):
+    """
+    Casefolded, synonym-expanded tokens of a field name, without unit
+    words and plural endings. Returns an empty tuple for blanks.
+    """
+    if not isinstance(value, str):
+        return ()
+    tokens = []
+    for token in _TOKEN.findall(value.casefold()):
+        for word in FIELD_SYNONYMS.get(token, token).split():
+            if word in FIELD_STOPWORDS:
+                continue
+            if len(word) > 4 and word.endswith("s") and not word.endswith("ss"):
+                word = word[:-1]
+            if word not in tokens:
+                tokens.append(word)
+    return tuple(tokens)
+
+def field_key(value):
+    """
+    Normalized key under which two field names count as the same field,
+    e.g. "Dept. of Computer Science" and "computer science". Values with
+    no meaningful token fall back to their stripped, casefolded text.
+    """
+    tokens = field_tokens(value)
+    if tokens:
+        return " ".join(sorted(tokens))
+    return value.strip().casefold() if isinstance(value, str) else value
+
+class FieldIndex:
+    """
+    Inverted token index over a fixed list of field names. Token postings
+    are stored as one CSR array pair, so ranking every field against a
+    query is a single bincount over the query's postings.
+    """
+
+    def __init__(self, fields):
+        self.fields = list(fields)
+        vocabulary = {}
+        token_ids = []
+        owners = []
+        sizes = []
+        for position, field in enumerate(self.fields):
+            tokens = field_tokens(field)
+            sizes.append(len(tokens))
+            for token in tokens:
+                token_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                owners.append(position)
+        token_ids = np.asarray(token_ids, dtype=np.int64)
+        order = np.argsort(token_ids, kind="stable")
+        self._vocabulary = vocabulary
+        self._postings = np.asarray(owners, dtype=np.int64)[order]
+        self._offsets = np.concatenate(([0], np.cumsum(np.bincount(token_ids, minlength=len(vocabulary)))))
+        self._sizes = np.asarray(sizes, dtype=float)
+
+    def similarities(self, value):
+        """
+        Jaccard similarity of `value`'s tokens with every indexed field.
+        """
+        tokens = field_tokens(value)
+        ids = [self._vocabulary[t] for t in tokens if t in self._vocabulary]
+        if not ids:
+            return np.zeros(len(self.fields))
+        hits = np.concatenate([self._postings[self._offsets[i]:self._offsets[i + 1]] for i in ids])
+        shared = np.bincount(hits, minlength=len(self.fields))
+        return shared / (self._sizes + len(tokens) - shared)
+
+    def ranked(self, value):
+        """
+        Positions of the indexed fields sharing at least one token with
+        `value`, most similar first (ties in index order).
+        """
+        similarity = self.similarities(value)
+        candidates = np.flatnonzero(similarity > 0)
+        return candidates[np.argsort(-similarity[candidates], kind="stable")]
@@ -1,42 +1,195 @@
+import hashlib
+import zipfile
 import pandas as pd
-from io import BytesIO
-import docx
+from xml.etree.ElementTree import iterparse
+from utils.cache import LRUCache
 
-def read_uploaded_file(uploaded_file):
+# Parsed uploads keyed by content hash, so Streamlit reruns skip re-parsing
+_parse_cache = LRUCache(max_bytes=512 * 1024 * 1024, max_entries=32)
+
+# Files above this size are read in chunks into compact dtypes
+STREAMING_THRESHOLD_BYTES = 20 * 1024 * 1024
+DEFAULT_CHUNKSIZE = 50_000
+
+# Compact dtypes applied to the normalized, mapped columns in both reading modes
+_CATEGORY_COLUMNS = {"field", "department", "specialization"}
+_STRING_COLUMNS = {"matric number"}
+
+def read_uploaded_file(uploaded_file, column_map=None, streaming=None, on_batch=None, **options):
     """
     Reads uploaded CSV, XLSX, or DOCX file and returns a pandas DataFrame
     with lowercase column names for consistency.
+    column_map optionally copies a source column into a standard one,
+    e.g. {"name": "student name"}. streaming=True reads the file in chunks
+    into compact dtypes (default: only for files above
+    STREAMING_THRESHOLD_BYTES), handing each normalized batch to
+    on_batch (e.g. a utils.validation.BatchValidator) before the batches
+    are joined. Results are cached on a hash of the file content, the
+    column map and the reader options; on a cache hit on_batch is not
+    called.
     """
 
     if uploaded_file is None:
         return None
 
     filename = uploaded_file.name.lower()
+    # Hashed in chunks straight from the file, so the raw bytes are never held twice
+    digest, size = _file_digest(uploaded_file)
+    if streaming is None:
+        streaming = size > STREAMING_THRESHOLD_BYTES
+    key = _cache_key(digest, filename, column_map, dict(options, streaming=streaming))
 
+    df = _parse_cache.get(key)
+    if df is None:
+        position = uploaded_file.tell()
+        if streaming:
+            batches = _iter_batches(uploaded_file, filename, column_map, **options)
+            if on_batch is not None:
+                batches = _observed(batches, on_batch)
+            df = _concat_batches(batches)
+        else:
+            df = _compact(_apply_column_map(_parse(uploaded_file, filename, column_map, **options), column_map))
+        uploaded_file.seek(position)
+        _parse_cache.put(key, df, int(df.memory_usage(deep=True).sum()))
+    # Callers add columns to the frame, so never hand out the cached object. Large
+    # streamed frames get a shallow copy: added columns stay on the copy without
+    # duplicating the data
+    return df.copy(deep=not streaming)
+
+def clear_parse_cache():
+    _parse_cache.clear()
+
+def iter_uploaded_file(uploaded_file, column_map=None, chunksize=DEFAULT_CHUNKSIZE, sheet=0, table_index=0):
+    """
+    Reads an uploaded (or opened) CSV, XLSX, or DOCX file in batches of at
+    most `chunksize` rows without loading the whole file. Each batch has
+    normalized, mapped columns in compact dtypes (category for fields,
+    string for matric numbers). `sheet` selects the XLSX worksheet and
+    `table_index` the DOCX table.
+    """
+    if uploaded_file is None:
+        return iter(())
+    return _iter_batches(uploaded_file, uploaded_file.name.lower(), column_map, chunksize, sheet, table_index)
+
+def _iter_batches(file, filename, column_map=None, chunksize=DEFAULT_CHUNKSIZE, sheet=0, table_index=0):
     if filename.endswith(".csv"):
-        df = pd.read_csv(uploaded_file)
+        chunks = pd.read_csv(file, chunksize=chunksize, dtype=_text_dtypes(file, pd.read_csv, column_map, "string"))
 
     elif filename.endswith(".xlsx"):
-        df = pd.read_excel(uploaded_file)
+        chunks = _iter_xlsx_chunks(file, chunksize, sheet)
 
     elif filename.endswith(".docx"):
-        doc = docx.Document(uploaded_file)
-        data = []
-        keys = []
+        chunks = iter([read_docx_table(file, table_index)])
+
+    else:
+        raise ValueError("Unsupported file format. Only CSV, XLSX, and DOCX are supported.")
+
+    for chunk in chunks:
+        yield _compact(_normalize_chunk(chunk, column_map))
+
+def _iter_xlsx_chunks(file, chunksize, sheet):
+    import openpyxl
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[sheet] if isinstance(sheet, int) else workbook[sheet]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        # Headers and blank rows as pd.read_excel gives them: empty rows are kept
+        # unless nothing follows them
+        header = [f"Unnamed: {i}" if value is None else str(value) for i, value in enumerate(header)]
+        blank = tuple([None] * len(header))
+        batch = []
+        blanks = 0
+        for row in rows:
+            if all(value is None for value in row):
+                blanks += 1
+                continue
+            batch.extend([blank] * blanks)
+            blanks = 0
+            batch.append(row[:len(header)])
+            if len(batch) >= chunksize:
+                yield _xlsx_frame(batch, header)
+                batch = []
+        if batch:
+            yield _xlsx_frame(batch, header)
+    finally:
+        workbook.close()
+
+def _xlsx_frame(rows, header):
+    # Empty cells are NaN as with pd.read_excel, not None in text columns
+    frame = pd.DataFrame(rows, columns=header)
+    return frame.where(frame.notna())
+
+def _normalize_chunk(df, column_map):
+    df.columns = df.columns.str.strip().str.lower()
+    return _apply_column_map(df, column_map)
+
+def _text_dtypes(file, read, column_map, dtype):
+    # Columns that become matric numbers (by name or through column_map) are read as
+    # text, so "001" is not parsed to 1. The header is read first; the position is restored
+    sources = set(_STRING_COLUMNS)
+    for target, source in (column_map or {}).items():
+        if target in _STRING_COLUMNS and source:
+            sources.add(source.strip().lower())
+    start = file.tell()
+    header = read(file, nrows=0).columns
+    file.seek(start)
+    return {col: dtype for col in header if str(col).strip().lower() in sources}
+
+def _compact(df):
+    for col in df.columns:
+        if col in _STRING_COLUMNS:
+            df[col] = df[col].astype("string")
+        elif col in _CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
+    return df
+
+def _concat_batches(batches):
+    batches = list(batches)
+    if not batches:
+        return pd.DataFrame()
+    # Align categories so concatenation keeps the compact categorical dtype
+    for col in _CATEGORY_COLUMNS.intersection(batches[0].columns):
+        if all(col in b.columns and isinstance(b[col].dtype, pd.CategoricalDtype) for b in batches):
+            categories = pd.api.types.union_categoricals([b[col] for b in batches]).categories
+            for b in batches:
+                b[col] = b[col].cat.set_categories(categories)
+    return pd.concat(batches, ignore_index=True)
 
-        # Attempt to read the first table
-        if not doc.tables:
-            raise ValueError("DOCX file does not contain any tables.")
+def _observed(batches, on_batch):
+    for batch in batches:
+        on_batch(batch)
+        yield batch
 
-        table = doc.tables[0]
-        for i, row in enumerate(table.rows):
-            text = [cell.text.strip() for cell in row.cells]
-            if i == 0:
-                keys = text
-            else:
-                data.append(dict(zip(keys, text)))
+def _file_digest(uploaded_file, chunk_size=1024 * 1024):
+    # SHA-256 and size of the rest of the file, read in chunks; the position is restored
+    position = uploaded_file.tell()
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: uploaded_file.read(chunk_size), b""):
+        digest.update(chunk)
+        size += len(chunk)
+    uploaded_file.seek(position)
+    return digest.hexdigest(), size
 
-        df = pd.DataFrame(data)
+def _cache_key(digest, filename, column_map, options):
+    extension = filename.rsplit(".", 1)[-1]
+    mapping = tuple(sorted((column_map or {}).items()))
+    return (digest, extension, mapping, tuple(sorted(options.items())))
+
+def _parse(file, filename, column_map=None, sheet=0, table_index=0):
+    if filename.endswith(".csv"):
+        df = pd.read_csv(file, dtype=_text_dtypes(file, pd.read_csv, column_map, "string"))
+
+    elif filename.endswith(".xlsx"):
+        # Cell values as openpyxl gives them (1, not 1.0 next to a blank), as when streaming
+        read = lambda f, **kwargs: pd.read_excel(f, sheet_name=sheet, **kwargs)
+        df = read(file, dtype=_text_dtypes(file, read, column_map, object))
+
+    elif filename.endswith(".docx"):
+        df = read_docx_table(file, table_index)
 
     else:
         raise ValueError("Unsupported file format. Only CSV, XLSX, and DOCX are supported.")
@@ -44,3 +197,142 @@ def read_uploaded_file(uploaded_file):
     # Normalize column names
     df.columns = df.columns.str.strip().str.lower()
     return df
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def read_docx_table(file, table_index=0):
+    """
+    Extracts one top-level table from a DOCX file into a DataFrame, using
+    the first row as the header. word/document.xml is streamed with
+    iterparse and cell text is collected straight into columns, so large
+    tables never build python-docx objects. Cell text follows python-docx
+    (paragraphs joined by newlines, merged cells repeated, stripped).
+    """
+    with zipfile.ZipFile(file) as archive, archive.open("word/document.xml") as xml:
+        rows = _iter_docx_table_rows(xml, table_index)
+        keys = next(rows, None)
+        if keys is None:
+            if table_index == 0:
+                raise ValueError("DOCX file does not contain any tables.")
+            raise ValueError(f"DOCX file does not contain a table at index {table_index}.")
+
+        # Later duplicate headers win, as with dict(zip(keys, row))
+        positions = {}
+        for i, key in enumerate(keys):
+            positions.pop(key, None)
+            positions[key] = i
+        order = sorted(positions, key=keys.index)
+        columns = {key: [] for key in order}
+        n_rows = 0
+        for row in rows:
+            n_rows += 1
+            for key in order:
+                i = positions[key]
+                columns[key].append(row[i] if i < len(row) else None)
+
+    if n_rows == 0:
+        return pd.DataFrame()
+    return pd.DataFrame(columns)
+
+def _iter_docx_table_rows(xml, table_index):
+    body_tag, tbl_tag, tr_tag, tc_tag, p_tag = _W + "body", _W + "tbl", _W + "tr", _W + "tc", _W + "p"
+    stack = []
+    body = None
+    tables_seen = 0
+    table = None          # element of the selected table while inside it
+    nested = 0            # depth of tables nested inside the selected one
+    row = None
+    cell = None
+    merged_above = {}     # grid column -> text of the cell that starts a vertical merge
+
+    for event, elem in iterparse(xml, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            parent = stack[-1] if stack else None
+            stack.append(tag)
+            if tag == body_tag:
+                body = elem
+            elif tag == tbl_tag:
+                if table is not None:
+                    nested += 1
+                elif parent == body_tag:
+                    if tables_seen == table_index:
+                        table = elem
+                    tables_seen += 1
+            elif table is not None and not nested:
+                if tag == tr_tag:
+                    row = []
+                elif tag == tc_tag:
+                    cell = []
+            continue
+
+        stack.pop()
+        if table is not None:
+            if tag == tbl_tag:
+                if nested:
+                    nested -= 1
+                else:
+                    return
+            elif nested:
+                pass
+            elif tag == p_tag and cell is not None and stack and stack[-1] == tc_tag:
+                cell.append(_docx_paragraph_text(elem))
+            elif tag == tc_tag:
+                _append_docx_cell(row, elem, "\n".join(cell).strip(), merged_above)
+                cell = None
+            elif tag == tr_tag:
+                yield row
+                row = None
+                table.remove(elem)
+        elif body is not None and stack and stack[-1] == body_tag:
+            # Drop finished top-level content to keep memory flat
+            body.remove(elem)
+
+def _append_docx_cell(row, tc, text, merged_above):
+    span = 1
+    merge = None
+    properties = tc.find(_W + "tcPr")
+    if properties is not None:
+        grid_span = properties.find(_W + "gridSpan")
+        if grid_span is not None:
+            span = int(grid_span.get(_W + "val", 1))
+        v_merge = properties.find(_W + "vMerge")
+        if v_merge is not None:
+            merge = v_merge.get(_W + "val", "continue")
+    column = len(row)
+    if merge == "continue":
+        text = merged_above.get(column, text)
+    elif merge == "restart":
+        merged_above[column] = text
+    else:
+        merged_above.pop(column, None)
+    row.extend([text] * span)
+
+def _docx_paragraph_text(p):
+    parts = []
+    for child in p:
+        if child.tag == _W + "r":
+            _docx_run_text(child, parts)
+        elif child.tag == _W + "hyperlink":
+            for run in child.iterfind(_W + "r"):
+                _docx_run_text(run, parts)
+    return "".join(parts)
+
+def _docx_run_text(run, parts):
+    for child in run:
+        tag = child.tag
+        if tag == _W + "t":
+            parts.append(child.text or "")
+        elif tag in (_W + "tab", _W + "ptab"):
+            parts.append("\t")
+        elif tag in (_W + "br", _W + "cr"):
+            parts.append("\n")
+        elif tag == _W + "noBreakHyphen":
+            parts.append("-")
+
+def _apply_column_map(df, column_map):
+    for target, source in (column_map or {}).items():
+        source = source.strip().lower()
+        if source and source != target and source in df.columns:
+            df[target] = df[source]
+    return df
@@ -0,0 +1,136 @@
+import heapq
+
+INF = float("inf")
+
+class MinCostFlow:
+    """
+    Sparse min-cost flow solver (primal-dual). Each phase runs Dijkstra with
+    node potentials, then pushes a blocking flow (Dinic) along every
+    shortest path at once, so the number of phases is bounded by the number
+    of distinct path costs rather than by the amount of flow. Edge costs
+    must be non-negative integers.
+    """
+
+    def __init__(self, n_nodes):
+        self.n_nodes = n_nodes
+        self.adj = [[] for _ in range(n_nodes)]
+        self.to = []
+        self.cap = []
+        self.cost = []
+        self.initial_cap = []
+
+    def add_edge(self, u, v, cap, cost=0):
+        """
+        Adds a directed edge and returns its id (use with edge_flow).
+        """
+        edge = len(self.to)
+        self.adj[u].append(edge)
+        self.to.append(v)
+        self.cap.append(cap)
+        self.cost.append(cost)
+        self.initial_cap.append(cap)
+        self.adj[v].append(edge + 1)
+        self.to.append(u)
+        self.cap.append(0)
+        self.cost.append(-cost)
+        self.initial_cap.append(0)
+        return edge
+
+    def edge_flow(self, edge):
+        return self.initial_cap[edge] - self.cap[edge]
+
+    def flow(self, source, sink, limit=INF):
+        """
+        Sends up to `limit` units from source to sink at minimum cost.
+        Returns (flow, cost).
+        """
+        potential = [0] * self.n_nodes
+        total_flow = 0
+        total_cost = 0
+        while total_flow < limit:
+            dist = self._shortest_paths(source, potential)
+            if dist[sink] == INF:
+                break
+            cap_dist = dist[sink]
+            for v in range(self.n_nodes):
+                potential[v] += min(dist[v], cap_dist)
+            pushed = self._blocking_flow(source, sink, potential, limit - total_flow)
+            if pushed == 0:
+                break
+            total_flow += pushed
+            total_cost += pushed * (potential[sink] - potential[source])
+        return total_flow, total_cost
+
+    def _shortest_paths(self, source, potential):
+        adj, to, cap, cost = self.adj, self.to, self.cap, self.cost
+        dist = [INF] * self.n_nodes
+        dist[source] = 0
+        heap = [(0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            pu = potential[u]
+            for e in adj[u]:
+                if cap[e] > 0:
+                    v = to[e]
+                    nd = d + cost[e] + pu - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        heapq.heappush(heap, (nd, v))
+        return dist
+
+    def _blocking_flow(self, source, sink, potential, limit):
+        # Dinic restricted to zero reduced-cost edges
+        adj, to, cap, cost = self.adj, self.to, self.cap, self.cost
+        pushed_total = 0
+        while pushed_total < limit:
+            level = [-1] * self.n_nodes
+            level[source] = 0
+            queue = [source]
+            for u in queue:
+                pu = potential[u]
+                for e in adj[u]:
+                    v = to[e]
+                    if cap[e] > 0 and level[v] < 0 and cost[e] + pu - potential[v] == 0:
+                        level[v] = level[u] + 1
+                        queue.append(v)
+            if level[sink] < 0:
+                break
+
+            pointer = [0] * self.n_nodes
+            path = []
+            u = source
+            while True:
+                if u == sink:
+                    amount = min(limit - pushed_total, min(cap[e] for e in path))
+                    for e in path:
+                        cap[e] -= amount
+                        cap[e ^ 1] += amount
+                    pushed_total += amount
+                    if pushed_total >= limit:
+                        break
+                    path = []
+                    u = source
+                    continue
+                edges = adj[u]
+                advanced = False
+                while pointer[u] < len(edges):
+                    e = edges[pointer[u]]
+                    v = to[e]
+                    if cap[e] > 0 and level[v] == level[u] + 1 and cost[e] + potential[u] - potential[v] == 0:
+                        path.append(e)
+                        u = v
+                        advanced = True
+                        break
+                    pointer[u] += 1
+                if advanced:
+                    continue
+                if u == source:
+                    break
+                # Dead end: retreat and skip the edge that led here
+                level[u] = -1
+                e = path.pop()
+                u = to[e ^ 1]
+                pointer[u] += 1
+        return pushed_total
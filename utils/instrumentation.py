@@ -0,0 +1,113 @@
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+logger = logging.getLogger("assignment.diagnostics")
+
+# tracemalloc is process-wide: trackers share it and the last one out stops it
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_started = False
+
+class Tracker:
+    """
+    Records context-managed spans with wall time, CPU time, peak traced
+    memory and row counts. Spans may nest; a parent's peak includes its
+    children. Each finished span is also logged as one JSON line.
+    Tracker(enabled=False) hands out spans that measure nothing.
+    Memory tracking is opt-in (track_memory=True): tracemalloc slows
+    everything in the process down several times over, including wall
+    times and other threads, and its peak is shared by concurrent
+    trackers. For clean numbers, time and measure memory in separate
+    runs, as benchmarks/run.py does.
+    """
+
+    def __init__(self, enabled=True, track_memory=False):
+        self.enabled = enabled
+        self.track_memory = enabled and track_memory
+        self.records = []
+        self._stack = []
+
+    @contextmanager
+    def span(self, name, rows=None, **extra):
+        """
+        Measures the enclosed block. The yielded dict can be updated inside
+        the block, e.g. record["rows"] = len(df).
+        """
+        record = {"stage": name, "rows": rows, **extra}
+        if not self.enabled:
+            yield record
+            return
+
+        if self.track_memory and not self._stack:
+            _start_tracing()
+        if self.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+            tracemalloc.reset_peak()
+            record["_base"] = current
+            record["_peak"] = current
+        record["depth"] = len(self._stack)
+        self._stack.append(record)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["wall_s"] = round(time.perf_counter() - wall, 6)
+            record["cpu_s"] = round(time.process_time() - cpu, 6)
+            self._stack.pop()
+            if self.track_memory:
+                peak = max(record.pop("_peak"), tracemalloc.get_traced_memory()[1])
+                record["peak_mib"] = round((peak - record.pop("_base")) / (1024 * 1024), 3)
+                if self._stack:
+                    self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+            self.records.append(record)
+            logger.info(json.dumps(record, default=str))
+            if self.track_memory and not self._stack:
+                _stop_tracing()
+
+    def add(self, name, wall_s, rows=None, **extra):
+        """
+        Records a stage measured elsewhere (e.g. in a worker process).
+        """
+        record = {"stage": name, "rows": rows, "depth": len(self._stack), "wall_s": round(wall_s, 6), **extra}
+        if self.enabled:
+            self.records.append(record)
+            logger.info(json.dumps(record, default=str))
+        return record
+
+    def to_frame(self):
+        import pandas as pd
+        columns = ["stage", "rows", "wall_s", "cpu_s", "peak_mib", "depth", "error"]
+        frame = pd.DataFrame(self.records)
+        return frame.reindex(columns=columns + [c for c in frame.columns if c not in columns])
+
+    def to_json(self):
+        return json.dumps(self.records, indent=2, default=str)
+
+    def to_log_lines(self):
+        return "\n".join(json.dumps(record, default=str) for record in self.records)
+
+def _start_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_users += 1
+
+def _stop_tracing():
+    global _tracing_users, _tracing_started
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
@@ -0,0 +1,171 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+# Finished jobs kept for lookup by id; the oldest are dropped past this
+MAX_FINISHED_JOBS = 32
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a job's work when cancellation was requested. Like
+    KeyboardInterrupt it is not an Exception, so the work's own
+    `except Exception` handlers (e.g. per-format report errors) let it
+    through.
+    """
+
+class Job:
+    """
+    One unit of background work. The work function receives the job's
+    `report` method as its progress callback; state is read from the
+    attributes: status ("queued", "running", "done", "failed" or
+    "cancelled"), stage, done, total, result, error and stages (one
+    record per finished stage with its wall time).
+    """
+
+    def __init__(self, job_id, label=None):
+        self.id = job_id
+        self.label = label
+        self.status = "queued"
+        self.stage = None
+        self.done = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.stages = []
+        self.created = time.time()
+        self.finished = None
+        self._stage_started = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def report(self, stage, done=None, total=None):
+        """
+        Records progress, e.g. report("assigning field", 3, 12). Raises
+        JobCancelled once cancel() has been called, which stops the work
+        at its next progress point.
+        """
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self.id} was cancelled.")
+        with self._lock:
+            now = time.perf_counter()
+            if stage != self.stage:
+                self._close_stage(now)
+                self.stage = stage
+                self._stage_started = now
+            self.done = done
+            self.total = total
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def running(self):
+        return self.status in ("queued", "running")
+
+    @property
+    def fraction(self):
+        """
+        Share of the current stage that is done (0.0 to 1.0), or None when
+        the stage has no known total.
+        """
+        if not self.total or self.done is None:
+            return None
+        return min(max(self.done / self.total, 0.0), 1.0)
+
+    def message(self):
+        if self.stage is None:
+            return self.status.capitalize()
+        if self.total:
+            return f"{self.stage.capitalize()} {self.done}/{self.total}"
+        return self.stage.capitalize()
+
+    def _close_stage(self, now):
+        if self.stage is not None:
+            self.stages.append({"stage": self.stage, "wall_s": round(now - self._stage_started, 6), "done": self.done, "total": self.total})
+
+    def _run(self, fn, args, kwargs):
+        if self._cancel.is_set():
+            self.status = "cancelled"
+            self.finished = time.time()
+            return
+        self.status = "running"
+        try:
+            result = fn(*args, progress=self.report, **kwargs)
+        except JobCancelled:
+            self.status = "cancelled"
+        except Exception as e:
+            self.error = e
+            self.status = "failed"
+        else:
+            self.result = result
+            self.status = "done"
+        finally:
+            with self._lock:
+                self._close_stage(time.perf_counter())
+            self.finished = time.time()
+
+class JobRunner:
+    """
+    Runs jobs on a small thread pool outside the caller (e.g. outside a
+    Streamlit script run) and keeps them by id, so a rerun can pick up a
+    running job, show its progress or cancel it. Heavy work inside a job
+    still uses the process pools of the functions it calls.
+    """
+
+    def __init__(self, max_workers=2):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, label=None, **kwargs):
+        """
+        Queues fn(*args, progress=job.report, **kwargs) and returns the
+        job id.
+        """
+        with self._lock:
+            job = Job(uuid.uuid4().hex, label)
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(job._run, fn, args, kwargs)
+        return job.id
+
+    def get(self, job_id):
+        """
+        The job with this id, or None when it is unknown or was pruned.
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def shutdown(self, wait=True):
+        for job in self.jobs():
+            job.cancel()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _prune(self):
+        finished = [job for job in self._jobs.values() if not job.running]
+        for job in finished[:max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job.id]
+
+@lru_cache(maxsize=None)
+def job_runner(max_workers=2):
+    """
+    One shared JobRunner for the life of the process, so jobs outlive the
+    script run (and session rerun) that started them.
+    """
+    return JobRunner(max_workers)
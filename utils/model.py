@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+# Assignment columns and where each one is gathered from
+ASSIGNMENT_COLUMNS = {
+    "assigned lecturer": ("lecturers", "name"),
+    "lecturer field": ("lecturers", "field"),
+    "student name": ("students", "name"),
+    "matric number": ("students", "matric number"),
+    "student field": ("students", "field"),
+}
+
+class Assignment:
+    """
+    Columnar assignment result. Keeps the student and lecturer frames it
+    was made from (not copied) and, for every assigned student in display
+    order, two int32 positions: the student's row and their lecturer's
+    row. The readable DataFrame (see ASSIGNMENT_COLUMNS) is gathered only
+    when `frame`, `select`, `take` or `column` is used, and is not kept:
+    callers hold on to what they render. Field names are available as
+    shared integer codes through `field_codes`.
+    """
+
+    def __init__(self, students, lecturers, student_pos, lecturer_pos, attrs=None):
+        self.students = students
+        self.lecturers = lecturers
+        self.student_pos = np.asarray(student_pos, dtype=np.int32)
+        self.lecturer_pos = np.asarray(lecturer_pos, dtype=np.int32)
+        self.attrs = dict(attrs or {})
+        self._field_codes = None
+
+    @classmethod
+    def from_frame(cls, frame):
+        """
+        Rebuilds an Assignment from its DataFrame form (e.g. a stored run),
+        with one student row per assignment row and one lecturer per name.
+        """
+        frame = frame.reset_index(drop=True)
+        students = pd.DataFrame({
+            "name": frame["student name"],
+            "matric number": frame["matric number"],
+            "field": frame["student field"],
+        })
+        lecturer_pos, names = pd.factorize(frame["assigned lecturer"])
+        first = np.unique(lecturer_pos, return_index=True)[1]
+        lecturers = pd.DataFrame({"name": names, "field": frame["lecturer field"].to_numpy()[first]})
+        return cls(students, lecturers, np.arange(len(frame)), lecturer_pos, frame.attrs)
+
+    def __len__(self):
+        return len(self.student_pos)
+
+    @property
+    def empty(self):
+        return len(self.student_pos) == 0
+
+    @property
+    def nbytes(self):
+        return self.student_pos.nbytes + self.lecturer_pos.nbytes
+
+    @property
+    def lecturer_of(self):
+        """
+        Lecturer position for every student row, -1 when unassigned.
+        """
+        lecturer_of = np.full(len(self.students), -1, dtype=np.int32)
+        lecturer_of[self.student_pos] = self.lecturer_pos
+        return lecturer_of
+
+    @property
+    def loads(self):
+        return np.bincount(self.lecturer_pos, minlength=len(self.lecturers))
+
+    @property
+    def field_codes(self):
+        """
+        (student codes, lecturer codes, field names): one int code per
+        student and lecturer row, shared between the two files after
+        field normalization (see utils.fields.field_key), -1 where the
+        field is missing. Computed once.
+        """
+        if self._field_codes is None:
+            # Imported here: utils.assigner builds on this module
+            from utils.assigner import _field_codes
+            if "field" in self.students.columns and "field" in self.lecturers.columns:
+                self._field_codes = _field_codes(self.students, self.lecturers)
+            else:
+                self._field_codes = (np.full(len(self.students), -1), np.full(len(self.lecturers), -1), pd.Index([]))
+        return self._field_codes
+
+    def column(self, name, rows=None):
+        """
+        Gathers one assignment column, for all rows or the given ones.
+        """
+        source, column = ASSIGNMENT_COLUMNS[name]
+        df = self.students if source == "students" else self.lecturers
+        positions = self.student_pos if source == "students" else self.lecturer_pos
+        if rows is not None:
+            positions = positions[rows]
+        # Gather by position, falling back to blanks when the column is absent
+        if column in df.columns:
+            return df[column].to_numpy()[positions]
+        return np.full(len(positions), "", dtype=object)
+
+    def select(self, columns, rows=None):
+        """
+        DataFrame of some assignment columns, for all rows or the given ones.
+        """
+        if rows is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+        return pd.DataFrame({name: self.column(name, rows) for name in columns})
+
+    def take(self, rows):
+        """
+        DataFrame of the given assignment rows only, e.g. a preview page.
+        """
+        return self.select(ASSIGNMENT_COLUMNS, rows)
+
+    def head(self, n=5):
+        return self.take(np.arange(min(n, len(self))))
+
+    @property
+    def frame(self):
+        """
+        The full readable DataFrame with attrs, built on each use.
+        """
+        frame = self.select(ASSIGNMENT_COLUMNS)
+        frame.attrs.update(self.attrs)
+        return frame
+
+    def unassigned(self):
+        """
+        Student rows that have no lecturer.
+        """
+        return self.students[self.lecturer_of < 0]
+
+    def records(self):
+        """
+        Every assigned student's own columns plus 'assigned lecturer', in
+        display order (the flat layout of assignment_logic).
+        """
+        records = self.students.iloc[self.student_pos].reset_index(drop=True)
+        records["assigned lecturer"] = self.column("assigned lecturer")
+        return records
+
+def as_frame(assignment):
+    """
+    The DataFrame form of an Assignment; DataFrames are returned as given.
+    """
+    return assignment.frame if isinstance(assignment, Assignment) else assignment
+
+def assignment_columns(assignment, columns):
+    """
+    Some columns of an Assignment or of its DataFrame form, gathering
+    only those columns from an Assignment.
+    """
+    if isinstance(assignment, Assignment):
+        return assignment.select(columns)
+    return assignment[list(columns)]
@@ -0,0 +1,305 @@
+import os
+import secrets
+from utils.file_reader import read_uploaded_file
+from utils.assigner import assign
+from utils.reports import generate_reports, write_report, build_report_bundle, safe_file_name, REPORT_FILE_NAMES
+from utils.instrumentation import Tracker
+from utils.validation import (
+    validate_students, validate_lecturers, student_batch_validator, lecturer_batch_validator, is_fatal, issue_messages,
+)
+from utils.cache import frame_fingerprint
+
+# Report format names accepted on the command line
+FORMAT_ALIASES = {
+    "pdf": "pdf",
+    "pdf-canvas": "pdf-canvas",
+    "word": "word",
+    "docx": "word",
+    "csv": "csv",
+    "excel": "excel",
+    "xlsx": "excel",
+}
+
+def load_students(file, column_map=None, tracker=None, **options):
+    """
+    Reads and validates a student file. Returns (DataFrame or None, issues)
+    where issues is the row-level table from utils.validation; the frame
+    is None when the file cannot be used at all. Reading and validation
+    are recorded as spans when a tracker is given. Streamed files are
+    validated batch by batch as they are read.
+    """
+    return _load(file, column_map, tracker, "student", ["department", "specialization"],
+                 validate_students, student_batch_validator(), **options)
+
+def load_lecturers(file, column_map=None, tracker=None, **options):
+    """
+    Reads and validates a lecturer file. Returns (DataFrame or None, issues)
+    where issues is the row-level table from utils.validation; the frame
+    is None when the file cannot be used at all. Reading and validation
+    are recorded as spans when a tracker is given. Streamed files are
+    validated batch by batch as they are read.
+    """
+    return _load(file, column_map, tracker, "lecturer", ["specialization", "department"],
+                 validate_lecturers, lecturer_batch_validator(), **options)
+
+def _load(file, column_map, tracker, label, alternatives, validate, validator, **options):
+    tracker = tracker or Tracker(enabled=False)
+    mapped = (column_map or {}).get("field")
+    with tracker.span(f"read {label} file") as record:
+        # Batches are validated with the field fallback applied to a shallow copy
+        df = read_uploaded_file(
+            file, column_map=column_map,
+            on_batch=lambda batch: validator.add(_fill_field(batch.copy(deep=False), mapped, alternatives)),
+            **options,
+        )
+        record["rows"] = len(df)
+    with tracker.span(f"validate {label} file", rows=len(df)):
+        _fill_field(df, mapped, alternatives)
+        # Files read whole (or found in the parse cache) are validated here in one pass
+        issues = validator.finish() if validator.batches else validate(df)
+    return (None if is_fatal(issues) else df), issues
+
+def _fill_field(df, mapped, alternatives):
+    # Fall back to the department/specialization columns when there is no 'field'
+    if "field" in df.columns:
+        return df
+    for alt in [mapped] + alternatives:
+        if alt and alt in df.columns:
+            df["field"] = df[alt]
+            return df
+    return df
+
+def load_previous_assignment(file):
+    """
+    Reads an earlier assignment (e.g. the CSV or Excel report) for
+    incremental re-assignment. Raises ValueError when it lacks the
+    'matric number' or 'assigned lecturer' column.
+    """
+    df = read_uploaded_file(file)
+    missing = [col for col in ("matric number", "assigned lecturer") if col not in df.columns]
+    if missing:
+        raise ValueError(f"Previous assignment is missing required columns: {', '.join(missing)}.")
+    return df
+
+def mode_column_errors(student_df, lecturer_df, mode):
+    """
+    Lists the problems that stop the chosen mode from running on these files.
+    """
+    errors = []
+    if mode == "field":
+        if "field" not in student_df.columns:
+            errors.append("Field-based assignment requires a 'field' column in the student file.")
+        if "field" not in lecturer_df.columns:
+            errors.append("Field-based assignment requires a 'field' column in the lecturer file.")
+    return errors
+
+def write_reports(assignment, formats, output_dir, split_by_lecturer=False, bundle=False, tracker=None, lecturers=None):
+    """
+    Writes each report format into output_dir and returns the written paths.
+    split_by_lecturer writes one report per lecturer into a folder each;
+    bundle writes a single assignment_reports.zip instead of loose files.
+    With split_by_lecturer, `lecturers` names the lecturers whose reports
+    must be rewritten; every other lecturer's folder is left untouched
+    when it already holds all of their reports, and written otherwise.
+    """
+    tracker = tracker or Tracker(enabled=False)
+    os.makedirs(output_dir, exist_ok=True)
+    if bundle:
+        path = os.path.join(output_dir, "assignment_reports.zip")
+        with tracker.span("report bundle", rows=len(assignment)):
+            archive = build_report_bundle(formats, assignment, split_by_lecturer=split_by_lecturer)
+        with archive, open(path, "wb") as out:
+            while True:
+                chunk = archive.read(1024 * 1024)
+                if not chunk:
+                    break
+                out.write(chunk)
+        return [path]
+
+    if split_by_lecturer:
+        parts = []
+        for lecturer, group in assignment.groupby("assigned lecturer"):
+            directory = os.path.join(output_dir, safe_file_name(lecturer))
+            if lecturers is not None and lecturer not in lecturers and _has_reports(directory, formats):
+                continue
+            parts.append((directory, group))
+    else:
+        parts = [(output_dir, assignment)]
+    paths = []
+    for directory, frame in parts:
+        os.makedirs(directory, exist_ok=True)
+        for fmt in formats:
+            partial = os.path.join(directory, f".{fmt}.partial")
+            try:
+                with tracker.span(f"report {fmt}", rows=len(frame)), open(partial, "wb") as out:
+                    _, file_name = write_report(fmt, frame.copy(), out)
+            except BaseException:
+                # Leave no half-written file behind
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+            path = os.path.join(directory, file_name)
+            os.replace(partial, path)
+            paths.append(path)
+    return paths
+
+def remove_reports(output_dir, lecturers):
+    """
+    Deletes the per-lecturer reports that write_reports(split_by_lecturer=True)
+    wrote for these lecturers (e.g. ones who left the roster), and their
+    folders once empty. Other files are kept. Returns the deleted paths.
+    """
+    removed = []
+    for lecturer in lecturers:
+        directory = os.path.join(output_dir, safe_file_name(lecturer))
+        for file_name in sorted(set(REPORT_FILE_NAMES.values())):
+            path = os.path.join(directory, file_name)
+            if os.path.isfile(path):
+                os.remove(path)
+                removed.append(path)
+        if os.path.isdir(directory) and not os.listdir(directory):
+            os.rmdir(directory)
+    return removed
+
+def _has_reports(directory, formats):
+    return all(os.path.isfile(os.path.join(directory, REPORT_FILE_NAMES.get(fmt.lower(), ""))) for fmt in formats)
+
+def assignment_job(student_df, lecturer_df, mode="random", formats=(), max_per_lecturer=None, seed=None,
+                   previous=None, trials=None, store=None, label=None, tracker=None, progress=None):
+    """
+    The app's "Generate Assignment" work as one background job (see
+    utils.jobs): assign, save the run in `store` when given, and render
+    every format so the downloads that follow come from the report cache
+    or the store. progress(stage, done, total) is passed down to the
+    assigner and the report renderers. Stages are recorded on `tracker`
+    as in run_cohort, for the caller to show once the job is done.
+    Returns a dict with the assignment, its run_id and a list of error
+    messages for the log.
+    """
+    tracker = tracker or Tracker(enabled=False)
+    progress = progress or (lambda stage, done=None, total=None: None)
+    progress("assigning students")
+    with tracker.span("assign students", rows=len(student_df), mode=mode):
+        assignment = assign(student_df, lecturer_df, mode, max_per_lecturer, seed=seed, previous=previous, trials=trials, progress=progress)
+    result = {"assignment": assignment, "run_id": None, "errors": []}
+    if assignment.empty:
+        return result
+    # Built once for the store and the renderers, then dropped with the job's locals
+    frame = assignment.frame
+
+    if store is not None:
+        progress("saving run")
+        try:
+            with tracker.span("save run", rows=len(frame)):
+                result["run_id"] = store.save_run(
+                    frame,
+                    mode=mode,
+                    seed=seed,
+                    params={"max_per_lecturer": max_per_lecturer, "trials": trials, "incremental": previous is not None},
+                    students_fingerprint=frame_fingerprint(student_df),
+                    lecturers_fingerprint=frame_fingerprint(lecturer_df),
+                    n_students=len(student_df),
+                    label=label,
+                )
+        except Exception as e:
+            result["errors"].append(f"Run store error: {e}")
+
+    if formats:
+        progress("rendering reports", 0, len(formats))
+        for fmt, report, error in generate_reports(formats, frame, progress=progress, tracker=tracker):
+            if error is not None:
+                result["errors"].append(f"Report ({fmt}) error: {error}")
+            elif result["run_id"] is not None:
+                try:
+                    store.save_report(result["run_id"], fmt, report)
+                except Exception as e:
+                    result["errors"].append(f"Run store error: {e}")
+    return result
+
+def bundle_job(formats, assignment, split_by_lecturer=False, tracker=None, progress=None):
+    """
+    Builds the ZIP of every format (see utils.reports.build_report_bundle)
+    as a background job, reporting each entry. Returns the spooled
+    archive file, positioned at the start; the caller closes it.
+    """
+    tracker = tracker or Tracker(enabled=False)
+    with tracker.span("report bundle", rows=len(assignment), split=split_by_lecturer):
+        return build_report_bundle(formats, assignment, split_by_lecturer=split_by_lecturer, progress=progress)
+
+def run_cohort(students_path, lecturers_path, output_dir, mode="random", formats=("pdf",),
+               max_per_lecturer=None, seed=None, split_by_lecturer=False, bundle=False, column_map=None,
+               diagnostics=False, previous_path=None, trials=None, store_path=None, track_memory=False):
+    """
+    Runs one cohort end to end: read and validate both files, assign, and
+    write the reports. Returns a summary dict (with per-stage timings under
+    "stages" when diagnostics is set, with peak memory when track_memory
+    is also set); problems are raised as ValueError
+    with the same messages the app shows.
+    previous_path names an earlier assignment (CSV, XLSX or DOCX report)
+    to update incrementally; loose per-lecturer reports are then rewritten
+    only for the lecturers whose groups changed (and any whose reports are
+    missing from output_dir), and the reports of lecturers who left are
+    deleted and listed under "removed_reports".
+    store_path saves the run and its assignment rows in that run store
+    (see utils.store); its id is returned as "run_id". A seed is drawn
+    when none is given, so the stored run can be reproduced.
+    """
+    column_map = column_map or {}
+    tracker = Tracker(enabled=diagnostics, track_memory=track_memory)
+    with open(students_path, "rb") as file:
+        student_df, student_issues = load_students(file, column_map.get("students"), tracker=tracker)
+    with open(lecturers_path, "rb") as file:
+        lecturer_df, lecturer_issues = load_lecturers(file, column_map.get("lecturers"), tracker=tracker)
+    issues = issue_messages(student_issues, "Student") + issue_messages(lecturer_issues, "Lecturer")
+    if student_df is None or lecturer_df is None:
+        raise ValueError(" ".join(issues))
+    errors = mode_column_errors(student_df, lecturer_df, mode)
+    if errors:
+        raise ValueError(" ".join(errors))
+
+    previous = None
+    if previous_path is not None:
+        with open(previous_path, "rb") as file:
+            previous = load_previous_assignment(file)
+
+    if store_path is not None and seed is None:
+        seed = secrets.randbits(32)
+    with tracker.span("assign students", rows=len(student_df), mode=mode):
+        assignment = assign(student_df, lecturer_df, mode, max_per_lecturer, seed=seed, previous=previous, trials=trials).frame
+    if assignment.empty:
+        raise ValueError("No assignments were generated. Please check your data and try again.")
+    changed = assignment.attrs.get("changed lecturers") if split_by_lecturer and not bundle else None
+    paths = write_reports(assignment, formats, output_dir, split_by_lecturer, bundle, tracker=tracker, lecturers=changed)
+    # Lecturers who dropped out of the roster have no group left to rewrite
+    current = set(assignment["assigned lecturer"])
+    kept_folders = {safe_file_name(lecturer) for lecturer in current}
+    departed = [lecturer for lecturer in sorted(set(changed or ()) - current) if safe_file_name(lecturer) not in kept_folders]
+    removed = remove_reports(output_dir, departed)
+    summary = {
+        "students": students_path,
+        "lecturers": lecturers_path,
+        "assigned": len(assignment),
+        "unassigned": len(student_df) - len(assignment),
+        "lecturers_used": int(assignment["assigned lecturer"].nunique()),
+        "warnings": issues,
+        "reports": paths,
+        "removed_reports": removed,
+        **{key: value for key, value in assignment.attrs.items()},
+    }
+    if store_path is not None:
+        from utils.store import open_store
+        with tracker.span("save run", rows=len(assignment)):
+            summary["run_id"] = open_store(store_path).save_run(
+                assignment,
+                mode=mode,
+                seed=seed,
+                params={"max_per_lecturer": max_per_lecturer, "trials": trials, "incremental": previous is not None},
+                students_fingerprint=frame_fingerprint(student_df),
+                lecturers_fingerprint=frame_fingerprint(lecturer_df),
+                n_students=len(student_df),
+                label=f"{os.path.basename(students_path)} / {os.path.basename(lecturers_path)}",
+            )
+        summary["seed"] = seed
+    if diagnostics:
+        summary["stages"] = tracker.records
+    return summary
@@ -1,18 +1,227 @@
 import pandas as pd
 import io
-from docx import Document
-from docx.shared import Inches
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-
-def generate_report(format: str, df: pd.DataFrame):
+import multiprocessing
+import re
+import shutil
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from utils.cache import LRUCache, frame_fingerprint
+from utils.instrumentation import Tracker
+from utils.model import as_frame
+
+# Rendered reports keyed by (assignment fingerprint, format). A split bundle adds one
+# entry per lecturer and format, so the entry limit leaves room for large cohorts
+# and the byte budget is what bounds the cache
+_report_cache = LRUCache(max_bytes=256 * 1024 * 1024, max_entries=16384)
+
+# File name each format's report is written under
+REPORT_FILE_NAMES = {
+    "csv": "assignment.csv",
+    "excel": "assignment.xlsx",
+    "pdf": "assignment.pdf",
+    "pdf-canvas": "assignment.pdf",
+    "word": "assignment.docx",
+}
+
+# Reports and bundles larger than this are spooled to a temporary file
+SPOOL_THRESHOLD_BYTES = 32 * 1024 * 1024
+
+def generate_report(format: str, df: pd.DataFrame, progress=None):
+    """
+    Renders the assignment in the given format and returns
+    (bytes, mime type, file name). Results are cached per assignment
+    content and format, so repeated downloads reuse the same bytes.
+    progress(stage, done, total) is called after each lecturer of the
+    PDF and Word reports. df may also be a utils.model.Assignment.
+    """
     format = format.lower()
+    df = as_frame(df)
+
+    if df.empty:
+        raise ValueError("Assignment data is empty.")
+
+    key = (frame_fingerprint(df), format)
+    report = _report_cache.get(key)
+    if report is None:
+        report = _render_report(format, df, progress)
+        _report_cache.put(key, report, len(report[0]))
+    return report
+
+def clear_report_cache():
+    _report_cache.clear()
+
+def generate_reports(formats, df: pd.DataFrame, max_workers=None, progress=None, tracker=None):
+    """
+    Renders several formats concurrently in a process pool and yields
+    (format, report, error) as each one finishes; report is the
+    (bytes, mime type, file name) tuple of generate_report, or None when
+    that format failed with `error`. Cached formats are yielded first, and
+    a failing format never blocks the others.
+    progress(stage, done, total) follows the lecturers when a single
+    format is rendered here, and the finished formats otherwise. Formats
+    not yet started are cancelled if the caller stops iterating.
+    Each rendered format is recorded on `tracker` as a "report <format>"
+    stage with its own render time, measured in the worker.
+    df may also be a utils.model.Assignment.
+    """
+    tracker = tracker or Tracker(enabled=False)
+    df = as_frame(df)
+    if df.empty:
+        raise ValueError("Assignment data is empty.")
+
+    fingerprint = frame_fingerprint(df)
+    pending = []
+    for fmt in formats:
+        report = _report_cache.get((fingerprint, fmt.lower()))
+        if report is not None:
+            tracker.add(f"report {fmt}", 0.0, rows=len(df), cached=True)
+            yield fmt, report, None
+        else:
+            pending.append(fmt)
+
+    if len(pending) == 1:
+        try:
+            with tracker.span(f"report {pending[0]}", rows=len(df)):
+                report = generate_report(pending[0], df, progress)
+        except Exception as e:
+            yield pending[0], None, e
+        else:
+            yield pending[0], report, None
+        return
+
+    if not pending:
+        return
+    pool = _get_report_pool(max_workers)
+    submitted = time.perf_counter()
+    futures = {pool.submit(_render_report_timed, fmt.lower(), df): fmt for fmt in pending}
+    try:
+        for done, future in enumerate(as_completed(futures), 1):
+            fmt = futures[future]
+            try:
+                report, wall_s, cpu_s = future.result()
+            except BrokenProcessPool:
+                # The pool itself died (not the format): render this one in-process
+                _reset_report_pool()
+                try:
+                    with tracker.span(f"report {fmt}", rows=len(df)):
+                        report, error = generate_report(fmt, df), None
+                except Exception as e:
+                    report, error = None, e
+            except Exception as e:
+                report, error = None, e
+                tracker.add(f"report {fmt}", time.perf_counter() - submitted, rows=len(df), error=f"{type(e).__name__}: {e}")
+            else:
+                error = None
+                tracker.add(f"report {fmt}", wall_s, rows=len(df), cpu_s=round(cpu_s, 6))
+                _report_cache.put((fingerprint, fmt.lower()), report, len(report[0]))
+            if progress is not None:
+                progress("rendering report", done, len(futures))
+            yield fmt, report, error
+    finally:
+        for future in futures:
+            future.cancel()
 
+def build_report_bundle(formats, df: pd.DataFrame, split_by_lecturer=False, spool_threshold=SPOOL_THRESHOLD_BYTES, progress=None):
+    """
+    Writes the selected formats into a ZIP archive one entry at a time and
+    returns the archive as a file object positioned at the start. Each
+    report is rendered into a spooled temporary file (kept in memory up to
+    spool_threshold, on disk past it) and copied into its entry, so only
+    one artifact is held at a time. With split_by_lecturer, every lecturer
+    gets their own reports in a folder named after them.
+    progress(stage, done, total) is called after each report entry.
+    df may also be a utils.model.Assignment.
+    """
+    df = as_frame(df)
     if df.empty:
         raise ValueError("Assignment data is empty.")
 
+    archive = tempfile.SpooledTemporaryFile(max_size=spool_threshold)
+    try:
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zipf:
+            if split_by_lecturer:
+                grouped = df.groupby("assigned lecturer")
+                parts = ((f"{safe_file_name(lecturer)}/", group) for lecturer, group in grouped)
+                total = grouped.ngroups * len(formats)
+            else:
+                parts = [("", df)]
+                total = len(formats)
+            done = 0
+            for prefix, frame in parts:
+                for fmt in formats:
+                    _write_bundle_entry(zipf, prefix, fmt, frame, spool_threshold)
+                    done += 1
+                    if progress is not None:
+                        progress("bundling report", done, total)
+    except BaseException:
+        archive.close()
+        raise
+    archive.seek(0)
+    return archive
+
+def _write_bundle_entry(zipf, prefix, fmt, df, spool_threshold):
+    key = (frame_fingerprint(df), fmt.lower())
+    report = _report_cache.get(key)
+    if report is not None:
+        report_bytes, mime, file_name = report
+        zipf.writestr(prefix + file_name, report_bytes)
+        return
+    with tempfile.SpooledTemporaryFile(max_size=spool_threshold) as spool:
+        mime, file_name = write_report(fmt, df, spool)
+        size = spool.tell()
+        spool.seek(0)
+        with zipf.open(prefix + file_name, "w", force_zip64=True) as entry:
+            shutil.copyfileobj(spool, entry, 1024 * 1024)
+        if size <= spool_threshold:
+            spool.seek(0)
+            _report_cache.put(key, (spool.read(), mime, file_name), size)
+
+def safe_file_name(name):
+    return re.sub(r'[\\/:*?"<>|]+', "_", str(name)).strip() or "unnamed"
+
+_report_pool = None
+_report_pool_lock = threading.Lock()
+
+def _get_report_pool(max_workers=None):
+    # One long-lived pool per process; workers are spawned so they never inherit app threads
+    global _report_pool
+    with _report_pool_lock:
+        if _report_pool is None:
+            _report_pool = ProcessPoolExecutor(max_workers=max_workers or 4, mp_context=multiprocessing.get_context("spawn"))
+        return _report_pool
+
+def _reset_report_pool():
+    global _report_pool
+    with _report_pool_lock:
+        if _report_pool is not None:
+            _report_pool.shutdown(wait=False, cancel_futures=True)
+        _report_pool = None
+
+def _render_report(format: str, df: pd.DataFrame, progress=None):
+    buffer = io.BytesIO()
+    mime, file_name = write_report(format, df, buffer, progress)
+    return buffer.getvalue(), mime, file_name
+
+def _render_report_timed(format: str, df: pd.DataFrame):
+    # Runs in a pool worker: the report with its own wall and CPU time
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    report = _render_report(format, df)
+    return report, time.perf_counter() - wall, time.process_time() - cpu
+
+def write_report(format: str, df: pd.DataFrame, output, progress=None):
+    """
+    Renders the assignment in the given format into a writable binary file
+    object and returns (mime type, file name). Nothing is cached.
+    progress(stage, done, total) is called after each lecturer of the PDF
+    and Word reports.
+    """
+    format = format.lower()
+
     # Ensure all relevant fields are present in the DataFrame
     # Normalize columns to lower case for matching
     df.columns = [c.strip().lower() for c in df.columns]
@@ -48,16 +257,16 @@ def generate_report(format: str, df: pd.DataFrame):
     df = df[ordered_cols]
 
     if format == "csv":
-        buffer = io.StringIO()
+        text = io.TextIOWrapper(output, encoding="utf-8", newline="")
         # Write header in uppercase and bold (where supported)
         df.columns = [col.upper() for col in df.columns]
-        df.to_csv(buffer, index=False)
-        return buffer.getvalue().encode(), "text/csv", "assignment.csv"
+        df.to_csv(text, index=False)
+        text.detach()
+        return "text/csv", REPORT_FILE_NAMES["csv"]
 
     elif format == "excel":
         import openpyxl
-        buffer = io.BytesIO()
-        with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        with pd.ExcelWriter(output, engine="openpyxl") as writer:
             df.columns = [col.upper() for col in df.columns]
             df.to_excel(writer, index=False)
             # Bold header row
@@ -65,13 +274,19 @@ def generate_report(format: str, df: pd.DataFrame):
             for cell in worksheet[1]:
                 cell.font = openpyxl.styles.Font(bold=True)
                 cell.alignment = openpyxl.styles.Alignment(horizontal='center')
-        return buffer.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "assignment.xlsx"
+        return "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", REPORT_FILE_NAMES["excel"]
 
     elif format == "pdf":
-        return generate_pdf(df)
+        generate_pdf(df, output, progress)
+        return "application/pdf", REPORT_FILE_NAMES["pdf"]
+
+    elif format == "pdf-canvas":
+        generate_pdf_streaming(df, output, progress)
+        return "application/pdf", REPORT_FILE_NAMES["pdf-canvas"]
 
     elif format == "word":
-        return generate_word(df)
+        generate_word(df, output, progress)
+        return "application/vnd.openxmlformats-officedocument.wordprocessingml.document", REPORT_FILE_NAMES["word"]
 
     else:
         raise ValueError(f"Unsupported format: {format}")
@@ -79,8 +294,13 @@ def generate_report(format: str, df: pd.DataFrame):
 # -------------------------
 # ✅ PDF Report Generator
 # -------------------------
-def generate_pdf(df: pd.DataFrame):
-    buffer = io.BytesIO()
+def generate_pdf(df: pd.DataFrame, output=None, progress=None):
+    # Rendering libraries are imported on first use to keep app start-up fast
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    buffer = io.BytesIO() if output is None else output
     doc = SimpleDocTemplate(buffer, pagesize=A4)
     elements = []
     styles = getSampleStyleSheet()
@@ -91,7 +311,7 @@ def generate_pdf(df: pd.DataFrame):
     group_cols = ["assigned lecturer", "lecturer field"]
     student_cols = ["student name", "matric number", "student field"]
     grouped = df.groupby(group_cols)
-    for (lecturer, field), group in grouped:
+    for done, ((lecturer, field), group) in enumerate(grouped, 1):
         heading = f"{lecturer} ({field})" if field else f"{lecturer}"
         elements.append(Paragraph(heading, styles['Heading2']))
         data = [[col.upper() for col in student_cols]] + group[student_cols].values.tolist()
@@ -106,40 +326,243 @@ def generate_pdf(df: pd.DataFrame):
         ]))
         elements.append(table)
         elements.append(Spacer(1, 18))
+        if progress is not None:
+            progress("laying out lecturer", done, grouped.ngroups)
     doc.build(elements)
+    if output is not None:
+        return None
     pdf_data = buffer.getvalue()
     buffer.close()
     return pdf_data, "application/pdf", "assignment.pdf"
 
+# -------------------------
+# ✅ Canvas PDF Report Generator
+# -------------------------
+# Share of the table width given to each student column
+_PDF_COLUMN_SHARES = [0.4, 0.25, 0.35]
+
+def generate_pdf_streaming(df: pd.DataFrame, output=None, progress=None):
+    """
+    Draws the same report as generate_pdf directly onto the canvas, one
+    lecturer and one page at a time, without building flowables for the
+    whole roster. Each lecturer's rows are taken from their group as it is
+    drawn; text too wide for its column wraps onto further lines, so no
+    cell is cut. Writes to `output` when given, otherwise returns the
+    bytes like generate_pdf. Memory is not flat: reportlab keeps every
+    finished page on the canvas until save(), so it grows with the page
+    count. Used for the "pdf-canvas" format; "pdf" stays on generate_pdf.
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib import colors
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.pdfgen import canvas
+    buffer = io.BytesIO() if output is None else output
+    page_width, page_height = A4
+    margin = 72
+    top = page_height - margin
+    line_height = 12
+    padding = 6
+    group_cols = ["assigned lecturer", "lecturer field"]
+    student_cols = ["student name", "matric number", "student field"]
+    headers = [col.upper() for col in student_cols]
+
+    widths = [(page_width - 2 * margin) * share for share in _PDF_COLUMN_SHARES]
+    edges = [margin]
+    for w in widths:
+        edges.append(edges[-1] + w)
+
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle("Student–Lecturer Assignment Report")
+    pdf.setStrokeColor(colors.grey)
+    pdf.setLineWidth(0.5)
+
+    def layout_cell(value, font, x, w):
+        # Wrapped lines of one cell, each with its centered x position
+        size = stringWidth(value, font, 10)
+        if size <= w - padding and "\n" not in value:
+            return [(value, x + (w - size) / 2)]
+        return [(line, x + (w - stringWidth(line, font, 10)) / 2) for line in _wrap_pdf_text(value, font, 10, w - padding, stringWidth)]
+
+    def layout_row(values, font, laid_out=None):
+        # Cells repeated within a lecturer's table (e.g. the field) are laid out once
+        cells = []
+        for column, (value, x, w) in enumerate(zip(values, edges, widths)):
+            if laid_out is None:
+                cells.append(layout_cell(value, font, x, w))
+                continue
+            lines = laid_out.get((column, value))
+            if lines is None:
+                lines = laid_out[column, value] = layout_cell(value, font, x, w)
+            cells.append(lines)
+        return cells, max(len(lines) for lines in cells) * line_height + padding
+
+    def draw_row(y, cells, height, font):
+        text = pdf.beginText()
+        text.setFont(font, 10)
+        for lines in cells:
+            for n, (line, x) in enumerate(lines):
+                text.setTextOrigin(x, y - 12.5 - n * line_height)
+                text.textOut(line)
+        pdf.drawText(text)
+        pdf.line(edges[0], y - height, edges[-1], y - height)
+        return y - height
+
+    header_cells, header_height = layout_row(headers, "Helvetica-Bold")
+
+    def start_table(y):
+        pdf.setFillColor(colors.lightgrey)
+        pdf.rect(edges[0], y - header_height, edges[-1] - edges[0], header_height, stroke=0, fill=1)
+        pdf.setFillColor(colors.black)
+        pdf.line(edges[0], y, edges[-1], y)
+        return draw_row(y, header_cells, header_height, "Helvetica-Bold")
+
+    def end_table(table_top, y):
+        for x in edges:
+            pdf.line(x, table_top, x, y)
+
+    def new_page():
+        pdf.showPage()
+        pdf.setStrokeColor(colors.grey)
+        pdf.setLineWidth(0.5)
+        return top
+
+    y = top
+    pdf.setFont("Helvetica-Bold", 18)
+    pdf.drawCentredString(page_width / 2, y - 18, "Student–Lecturer Assignment Report")
+    y -= 22 + 6 + 12
+
+    grouped = df.groupby(group_cols)
+    for done, ((lecturer, field), group) in enumerate(grouped, 1):
+        # astype(str) keeps NaN, so missing values are blanked explicitly
+        values = group[student_cols]
+        rows = values.astype(str).where(values.notna(), "").to_numpy(dtype=object).tolist()
+        heading = f"{lecturer} ({field})" if field else f"{lecturer}"
+        laid_out = {}
+        first = layout_row(rows[0], "Helvetica", laid_out) if rows else ([], 0)
+        # Keep the heading together with the table header and a first row
+        if y - (12 + 24 + header_height + first[1]) < margin:
+            y = new_page()
+        else:
+            y -= 12
+        pdf.setFont("Helvetica-Bold", 14)
+        pdf.drawString(margin, y - 14, heading)
+        y -= 18 + 6
+
+        table_top = y
+        y = start_table(y)
+        for n, row in enumerate(rows):
+            cells, height = first if n == 0 else layout_row(row, "Helvetica", laid_out)
+            if y - height < margin and y < table_top - header_height:
+                end_table(table_top, y)
+                y = table_top = new_page()
+                y = start_table(y)
+            y = draw_row(y, cells, height, "Helvetica")
+        end_table(table_top, y)
+        y -= 18
+        if progress is not None:
+            progress("rendering lecturer", done, grouped.ngroups)
+
+    pdf.save()
+    if output is not None:
+        return None
+    return buffer.getvalue(), "application/pdf", "assignment.pdf"
+
+def _wrap_pdf_text(text, font, size, width, measure):
+    # Greedy word wrap; words wider than the column are broken between characters
+    lines = []
+    for paragraph in text.splitlines() or [""]:
+        line = ""
+        for word in paragraph.split(" "):
+            candidate = f"{line} {word}" if line else word
+            if measure(candidate, font, size) <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            line = ""
+            for char in word:
+                if line and measure(line + char, font, size) > width:
+                    lines.append(line)
+                    line = ""
+                line += char
+        lines.append(line)
+    return lines
+
 # -------------------------
 # ✅ Word Report Generator
 # -------------------------
-def generate_word(df: pd.DataFrame):
-    buffer = io.BytesIO()
+def generate_word(df: pd.DataFrame, output=None, progress=None):
+    """
+    Builds each lecturer's table as one pre-formed OOXML fragment and
+    inserts it in a single operation. Cell text is escaped column-wise for
+    the whole roster up front; centering comes from a table style defined
+    once per document.
+    """
+    from docx import Document
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+    buffer = io.BytesIO() if output is None else output
     doc = Document()
+    _add_word_table_style(doc)
     doc.add_heading("Student–Lecturer Assignment Report", level=1)
 
     group_cols = ["assigned lecturer", "lecturer field"]
     student_cols = ["student name", "matric number", "student field"]
+    cell_width = int(doc.sections[0].page_width - doc.sections[0].left_margin - doc.sections[0].right_margin) // 635 // len(student_cols)
+    cell_open = f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{cell_width}"/></w:tcPr><w:p>'
+    table_open = (
+        f'<w:tbl {nsdecls("w")}><w:tblPr><w:tblStyle w:val="{_WORD_TABLE_STYLE}"/><w:tblW w:type="auto" w:w="0"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+        '</w:tblPr><w:tblGrid>' + f'<w:gridCol w:w="{cell_width}"/>' * len(student_cols) + '</w:tblGrid>'
+        '<w:tr>' + "".join(
+            f'{cell_open}<w:r><w:rPr><w:b/></w:rPr><w:t xml:space="preserve">{col.upper()}</w:t></w:r></w:p></w:tc>'
+            for col in student_cols
+        ) + '</w:tr>'
+    )
+
+    # Row XML for every student, built with vectorized string operations
+    rows = pd.Series("<w:tr>", index=df.index)
+    for col in student_cols:
+        rows = rows + cell_open + '<w:r><w:t xml:space="preserve">' + _word_run_text(df[col]) + '</w:t></w:r></w:p></w:tc>'
+    rows = rows + "</w:tr>"
+
+    # Rows are picked by position, so duplicate index labels cannot repeat them
+    rows = rows.to_numpy()
+    body = doc.element.body
     grouped = df.groupby(group_cols)
-    for (lecturer, field), group in grouped:
+    for done, ((lecturer, field), positions) in enumerate(grouped.indices.items(), 1):
         heading = f"{lecturer} ({field})" if field else f"{lecturer}"
         doc.add_heading(heading, level=2)
-        table = doc.add_table(rows=1, cols=len(student_cols))
-        table.style = 'Table Grid'
-        hdr_cells = table.rows[0].cells
-        for i, column in enumerate(student_cols):
-            hdr_cells[i].text = column.upper()
-            for paragraph in hdr_cells[i].paragraphs:
-                for run in paragraph.runs:
-                    run.bold = True
-                paragraph.alignment = 1  # Center
-        for _, row in group.iterrows():
-            row_cells = table.add_row().cells
-            for i, col in enumerate(student_cols):
-                row_cells[i].text = str(row.get(col, ""))
-                for paragraph in row_cells[i].paragraphs:
-                    paragraph.alignment = 1  # Center
+        table = parse_xml(table_open + "".join(rows[positions]) + "</w:tbl>")
+        body.insert_element_before(table, "w:sectPr")
         doc.add_paragraph()
+        if progress is not None:
+            progress("rendering lecturer", done, grouped.ngroups)
     doc.save(buffer)
+    if output is not None:
+        return None
     return buffer.getvalue(), "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "assignment.docx"
+
+_WORD_TABLE_STYLE = "AssignmentTable"
+
+def _add_word_table_style(doc):
+    # Table Grid borders with centered paragraphs and a bold header row
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+    doc.styles.element.append(parse_xml(
+        f'<w:style {nsdecls("w")} w:type="table" w:customStyle="1" w:styleId="{_WORD_TABLE_STYLE}">'
+        '<w:name w:val="Assignment Table"/><w:basedOn w:val="TableGrid"/><w:uiPriority w:val="59"/>'
+        '<w:pPr><w:jc w:val="center"/></w:pPr>'
+        '<w:tblStylePr w:type="firstRow"><w:rPr><w:b/></w:rPr></w:tblStylePr>'
+        '</w:style>'
+    ))
+
+def _word_run_text(values: pd.Series):
+    # Escaped run content; tabs and line breaks become their own elements as with cell.text.
+    # Missing values are blank cells (astype(str) would keep them as NaN)
+    text = values.astype(str).where(values.notna(), "")
+    text = text.str.replace(r"[\x00-\x08\x0b\x0c\x0e-\x1f]", "", regex=True)
+    text = text.str.replace("&", "&amp;", regex=False).str.replace("<", "&lt;", regex=False).str.replace(">", "&gt;", regex=False)
+    text = text.str.replace("\t", '</w:t><w:tab/><w:t xml:space="preserve">', regex=False)
+    text = text.str.replace(r"\r\n|\r|\n", '</w:t><w:br/><w:t xml:space="preserve">', regex=True)
+    return text
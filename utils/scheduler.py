@@ -0,0 +1,52 @@
+import heapq
+import numpy as np
+
+class CapacityScheduler:
+    """
+    Hands out lecturer slots least-loaded first using a min-heap keyed on
+    (current load, random tie-break). Capacities are kept as counters, so
+    picking a lecturer costs O(log L) and no per-slot list is built.
+    Use np.inf for lecturers without a limit. `loads` starts the counters
+    from existing assignments, so new picks fill the emptiest lecturers.
+    """
+
+    def __init__(self, capacities, rng=None, loads=None):
+        rng = np.random.default_rng(rng)
+        self.capacities = np.asarray(capacities, dtype=float)
+        if loads is None:
+            self.loads = np.zeros(len(self.capacities), dtype=int)
+        else:
+            self.loads = np.asarray(loads, dtype=int).copy()
+        tie_break = rng.permutation(len(self.capacities))
+        self._heap = [
+            (int(self.loads[i]), int(tie_break[i]), i)
+            for i in range(len(self.capacities))
+            if self.capacities[i] > self.loads[i]
+        ]
+        heapq.heapify(self._heap)
+
+    @property
+    def remaining(self):
+        return float(np.sum(self.capacities - self.loads))
+
+    def take(self, count):
+        """
+        Picks up to `count` slots and returns the chosen lecturer positions.
+        Fewer are returned when every lecturer is full.
+        """
+        picks = np.empty(count, dtype=int)
+        heap = self._heap
+        capacities = self.capacities
+        for n in range(count):
+            if not heap:
+                picks = picks[:n]
+                break
+            load, tie, idx = heap[0]
+            picks[n] = idx
+            load += 1
+            if load < capacities[idx]:
+                heapq.heapreplace(heap, (load, tie, idx))
+            else:
+                heapq.heappop(heap)
+        self.loads += np.bincount(picks, minlength=len(self.loads))
+        return picks
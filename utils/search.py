@@ -0,0 +1,112 @@
+import numpy as np
+from utils.cache import LRUCache, frame_fingerprint
+from utils.model import as_frame, assignment_columns
+
+# Search indexes keyed by assignment content, kept across Streamlit reruns
+_index_cache = LRUCache(max_bytes=256 * 1024 * 1024, max_entries=8)
+
+SEARCH_COLUMNS = ["student name", "matric number", "assigned lecturer"]
+
+class SearchIndex:
+    """
+    Case-insensitive substring search over an assignment's student name,
+    matric number and lecturer columns. Each row's lowercased keys are
+    concatenated once; every UTF-8 byte trigram maps to the sorted rows
+    containing it (CSR layout). A query intersects the postings of its
+    trigrams and confirms the few survivors with a plain substring test.
+    Queries shorter than three bytes scan the keys until `limit` matches.
+    """
+
+    def __init__(self, df):
+        keys = _column_keys(df[SEARCH_COLUMNS[0]])
+        for column in SEARCH_COLUMNS[1:]:
+            keys = keys + "\n" + _column_keys(df[column])
+        self.keys = keys.tolist()
+
+        data = np.frombuffer("\0".join(self.keys).encode(), dtype=np.uint8)
+        # Trigrams crossing a row ("\0") or column ("\n") boundary cannot occur in a query
+        boundary = (data == 0) | (data == 10)
+        valid = ~(boundary[:-2] | boundary[1:-1] | boundary[2:])
+        if not valid.any():
+            self._trigrams = np.array([], dtype=np.int64)
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self._rows = np.array([], dtype=np.int64)
+            return
+        wide = data.astype(np.int64)
+        trigrams = (wide[:-2] << 16) | (wide[1:-1] << 8) | wide[2:]
+        rows = np.cumsum(data == 0)[:-2]
+        pairs = np.sort((trigrams[valid] << 32) | rows[valid])
+        pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        codes = pairs >> 32
+        starts = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+        self._trigrams = codes[starts]
+        self._offsets = np.append(starts, len(pairs))
+        self._rows = pairs & 0xFFFFFFFF
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self):
+        return self._trigrams.nbytes + self._offsets.nbytes + self._rows.nbytes + sum(len(k) + 49 for k in self.keys)
+
+    def search(self, query, limit=None):
+        """
+        Row positions (ascending) whose name, matric number or lecturer
+        contains `query`, ignoring case. At most `limit` when given.
+        """
+        query = query.lower()
+        if not query:
+            return np.arange(len(self.keys) if limit is None else min(limit, len(self.keys)))
+        encoded = query.encode()
+        if len(encoded) < 3:
+            return self._scan(query, range(len(self.keys)), limit)
+
+        codes = {(encoded[i] << 16) | (encoded[i + 1] << 8) | encoded[i + 2] for i in range(len(encoded) - 2)}
+        postings = []
+        for code in codes:
+            slot = np.searchsorted(self._trigrams, code)
+            if slot == len(self._trigrams) or self._trigrams[slot] != code:
+                return np.array([], dtype=np.int64)
+            postings.append(self._rows[self._offsets[slot]:self._offsets[slot + 1]])
+        postings.sort(key=len)
+        if len(encoded) == 3:
+            return postings[0] if limit is None else postings[0][:limit]
+        if limit is not None:
+            # The rarest trigram's rows are few enough to confirm one by one until the limit
+            return self._scan(query, postings[0].tolist(), limit)
+        candidates = postings[0]
+        for rows in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = candidates[np.isin(candidates, rows, assume_unique=True, kind="sort")]
+        return self._scan(query, candidates.tolist(), limit)
+
+    def _scan(self, query, positions, limit):
+        keys = self.keys
+        found = []
+        if limit == 0:
+            return np.asarray(found, dtype=np.int64)
+        for i in positions:
+            if query in keys[i]:
+                found.append(i)
+                if limit is not None and len(found) >= limit:
+                    break
+        return np.asarray(found, dtype=np.int64)
+
+def _column_keys(values):
+    # Lowercased text with missing values as empty strings (astype(str) keeps NaN)
+    return values.astype(str).where(values.notna(), "").str.lower()
+
+def search_index(assignment, fingerprint=None):
+    """
+    Returns the SearchIndex for an assignment, building it only when its
+    content changed; pass the assignment's frame_fingerprint to skip
+    hashing it again. `assignment` may be an Assignment or its DataFrame.
+    """
+    key = ("search", fingerprint or frame_fingerprint(as_frame(assignment)))
+    index = _index_cache.get(key)
+    if index is None:
+        index = SearchIndex(assignment_columns(assignment, SEARCH_COLUMNS))
+        _index_cache.put(key, index, index.nbytes)
+    return index
@@ -0,0 +1,212 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+import pandas as pd
+
+# Where runs are kept unless a path is given
+DEFAULT_STORE_PATH = os.environ.get("ASSIGNMENT_STORE", "assignment_runs.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    label TEXT,
+    mode TEXT,
+    seed INTEGER,
+    params TEXT,
+    students_fingerprint TEXT,
+    lecturers_fingerprint TEXT,
+    n_students INTEGER,
+    n_assigned INTEGER,
+    attrs TEXT
+);
+CREATE TABLE IF NOT EXISTS assignments (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    matric_number TEXT,
+    student_name TEXT,
+    student_field TEXT,
+    lecturer TEXT,
+    lecturer_field TEXT,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS assignments_matric ON assignments(matric_number);
+CREATE INDEX IF NOT EXISTS assignments_lecturer ON assignments(lecturer);
+CREATE TABLE IF NOT EXISTS reports (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    format TEXT NOT NULL,
+    mime TEXT,
+    file_name TEXT,
+    data BLOB,
+    PRIMARY KEY (run_id, format)
+);
+"""
+
+# Table columns and the assignment columns they hold
+_ASSIGNMENT_FIELDS = {
+    "matric_number": "matric number",
+    "student_name": "student name",
+    "student_field": "student field",
+    "lecturer": "assigned lecturer",
+    "lecturer_field": "lecturer field",
+}
+
+class AssignmentStore:
+    """
+    SQLite store of past runs: parameters, seed and input fingerprints per
+    run, every assignment row (indexed on matric number and lecturer) and
+    the rendered reports, so earlier results load and download without
+    being recomputed. Safe to share between threads.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def save_run(self, assignment, mode=None, seed=None, params=None, students_fingerprint=None,
+                 lecturers_fingerprint=None, n_students=None, label=None):
+        """
+        Stores an assignment DataFrame with how it was made and returns the
+        new run id. Values are stored as text; missing values (and missing
+        columns) as NULL, which load_run turns back into NaN.
+        """
+        rows = zip(
+            range(len(assignment)),
+            *(_text_or_null(assignment[column]) if column in assignment.columns else [None] * len(assignment)
+              for column in _ASSIGNMENT_FIELDS.values()),
+        )
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO runs (created_at, label, mode, seed, params, students_fingerprint, lecturers_fingerprint,"
+                " n_students, n_assigned, attrs) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"), label, mode,
+                    None if seed is None else int(seed), json.dumps(params or {}, default=str),
+                    students_fingerprint, lecturers_fingerprint, n_students, len(assignment),
+                    json.dumps(assignment.attrs, default=str),
+                ),
+            )
+            run_id = cursor.lastrowid
+            self._db.executemany(
+                f"INSERT INTO assignments (run_id, position, {', '.join(_ASSIGNMENT_FIELDS)}) VALUES ({run_id}, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return run_id
+
+    def runs(self, limit=50):
+        """
+        The most recent runs, newest first.
+        """
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT id, created_at, label, mode, seed, n_students, n_assigned FROM runs ORDER BY id DESC LIMIT ?",
+                self._db, params=(limit,),
+            )
+
+    def run_info(self, run_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, created_at, label, mode, seed, params, students_fingerprint, lecturers_fingerprint,"
+                " n_students, n_assigned, attrs FROM runs WHERE id = ?", (run_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        keys = ["id", "created_at", "label", "mode", "seed", "params", "students_fingerprint",
+                "lecturers_fingerprint", "n_students", "n_assigned", "attrs"]
+        info = dict(zip(keys, row))
+        info["params"] = json.loads(info["params"] or "{}")
+        info["attrs"] = json.loads(info["attrs"] or "{}")
+        return info
+
+    def load_run(self, run_id):
+        """
+        The stored assignment DataFrame of a run, with its attrs restored.
+        Raises KeyError for an unknown run.
+        """
+        info = self.run_info(run_id)
+        if info is None:
+            raise KeyError(f"No stored run with id {run_id}.")
+        with self._lock:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(_ASSIGNMENT_FIELDS)} FROM assignments WHERE run_id = ? ORDER BY position",
+                self._db, params=(run_id,),
+            )
+        df = df.rename(columns=_ASSIGNMENT_FIELDS)[["assigned lecturer", "lecturer field", "student name", "matric number", "student field"]]
+        df = _null_as_nan(df)
+        df.attrs.update(info["attrs"])
+        return df
+
+    def find_student(self, matric_number):
+        """
+        Every stored run that assigned this matric number, newest first.
+        """
+        with self._lock:
+            return _null_as_nan(pd.read_sql_query(
+                "SELECT r.id AS run_id, r.created_at, r.label, a.student_name, a.lecturer, a.lecturer_field"
+                " FROM assignments a JOIN runs r ON r.id = a.run_id WHERE a.matric_number = ? ORDER BY r.id DESC",
+                self._db, params=(str(matric_number).strip(),),
+            ))
+
+    def lecturer_students(self, lecturer, run_id=None):
+        """
+        Students of a lecturer in one run, or across all runs.
+        """
+        query = "SELECT run_id, matric_number, student_name, student_field FROM assignments WHERE lecturer = ?"
+        params = [lecturer]
+        if run_id is not None:
+            query += " AND run_id = ?"
+            params.append(run_id)
+        with self._lock:
+            return _null_as_nan(pd.read_sql_query(query + " ORDER BY run_id DESC, position", self._db, params=params))
+
+    def save_report(self, run_id, format, report):
+        """
+        Stores a rendered (bytes, mime type, file name) report for a run.
+        """
+        data, mime, file_name = report
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO reports (run_id, format, mime, file_name, data) VALUES (?, ?, ?, ?, ?)",
+                (run_id, format.lower(), mime, file_name, sqlite3.Binary(data)),
+            )
+
+    def load_report(self, run_id, format):
+        """
+        A stored (bytes, mime type, file name) report, or None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, mime, file_name FROM reports WHERE run_id = ? AND format = ?", (run_id, format.lower()),
+            ).fetchone()
+        return None if row is None else (bytes(row[0]), row[1], row[2])
+
+    def delete_run(self, run_id):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+
+def _text_or_null(values):
+    # astype(str) would store missing values as the text "nan"
+    return [None if missing else str(value) for value, missing in zip(values.tolist(), values.isna().tolist())]
+
+def _null_as_nan(df):
+    # NULL cells come back as None in text columns
+    return df.where(df.notna())
+
+@lru_cache(maxsize=None)
+def open_store(path=DEFAULT_STORE_PATH):
+    """
+    One shared AssignmentStore per path for the life of the process.
+    """
+    return AssignmentStore(path)
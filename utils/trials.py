@@ -0,0 +1,104 @@
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils.assigner import _field_codes, lecturer_capacities
+from utils.model import Assignment
+
+# Trials are drawn in fixed-size blocks, each with its own seed, so the
+# result does not depend on how many processes share the work
+TRIAL_BLOCK = 50
+
+# Below this many trial × student draws the process start-up costs more than it saves
+PARALLEL_MIN_DRAWS = 20_000_000
+
+def assign_best_of(student_df, lecturer_df, trials=200, max_per_lecturer=None, seed=None,
+                   variance_weight=1.0, max_workers=None, progress=None):
+    """
+    Runs `trials` random draws and keeps the best balanced one. Each trial
+    deals the students into a shuffled pool of every lecturer slot (the
+    file limit, else the global maximum, else an even share plus one).
+    A trial scores its field-match rate minus variance_weight times the
+    squared coefficient of variation of lecturer loads; ties go to the
+    earlier trial. All trials are scored with array operations, in worker
+    processes when there are enough of them. `seed` may be an int or a
+    numpy Generator. The result carries attrs["trials"], attrs["score"],
+    attrs["field match rate"] and attrs["load variance"].
+    progress(stage, done, total) is called as each block of trials is scored.
+    """
+    n_students = len(student_df)
+    n_lecturers = len(lecturer_df)
+    default = n_students // max(n_lecturers, 1) + 1
+    capacities = np.minimum(lecturer_capacities(lecturer_df, max_per_lecturer, default), n_students)
+    slots = np.repeat(np.arange(n_lecturers, dtype=np.int32), capacities.astype(int))
+    if len(slots) < n_students:
+        raise Exception("Not enough lecturer slots to assign all students.")
+
+    if "field" in student_df.columns and "field" in lecturer_df.columns:
+        student_codes, lecturer_codes, _ = _field_codes(student_df, lecturer_df)
+        # Missing fields are -1 on both sides; a blank lecturer field must not match a blank student one
+        lecturer_codes = np.where(lecturer_codes < 0, -2, lecturer_codes)
+    else:
+        student_codes = np.full(n_students, -1)
+        lecturer_codes = np.full(n_lecturers, -2)
+
+    rng = np.random.default_rng(seed)
+    trials = max(1, int(trials))
+    sizes = [min(TRIAL_BLOCK, trials - start) for start in range(0, trials, TRIAL_BLOCK)]
+    seeds = rng.integers(2**63, size=len(sizes)).tolist()
+    jobs = [(slots, student_codes, lecturer_codes, n_lecturers, s, size, variance_weight) for s, size in zip(seeds, sizes)]
+
+    def scored(blocks):
+        # Collect block results in order, reporting trials done after each block
+        results = []
+        for result in blocks:
+            results.append(result)
+            if progress is not None:
+                progress("scoring trials", sum(sizes[:len(results)]), trials)
+        return results
+
+    results = None
+    if len(jobs) > 1 and trials * n_students >= PARALLEL_MIN_DRAWS:
+        pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            results = scored(pool.map(_score_trials, *zip(*jobs)))
+        except BrokenProcessPool:
+            results = None  # Workers could not start (e.g. no importable __main__); score here instead
+        finally:
+            # Drop blocks not yet started if scoring was abandoned (e.g. a cancelled job)
+            pool.shutdown(cancel_futures=True)
+    if results is None:
+        results = scored(_score_trials(*job) for job in jobs)
+
+    best = results[0]
+    for result in results[1:]:
+        if result[0] > best[0]:
+            best = result
+    score, match_rate, variance, lecturer_pos = best
+
+    order = np.argsort(lecturer_pos, kind="stable")
+    return Assignment(student_df, lecturer_df, order, lecturer_pos[order], {
+        "trials": trials,
+        "score": float(score),
+        "field match rate": float(match_rate),
+        "load variance": float(variance),
+    })
+
+def _score_trials(slots, student_codes, lecturer_codes, n_lecturers, seed, count, variance_weight):
+    """
+    Draws and scores `count` trials at once. Returns (score, field-match
+    rate, load variance, lecturer position per student) of the best one.
+    """
+    n_students = len(student_codes)
+    rng = np.random.default_rng(seed)
+    draws = rng.permuted(np.broadcast_to(slots, (count, len(slots))), axis=1)[:, :n_students]
+
+    offsets = (np.arange(count) * n_lecturers)[:, None]
+    loads = np.bincount((draws + offsets).ravel(), minlength=count * n_lecturers).reshape(count, n_lecturers)
+    variance = loads.var(axis=1)
+    mean = n_students / max(n_lecturers, 1)
+    match_rate = np.count_nonzero(lecturer_codes[draws] == student_codes, axis=1) / max(n_students, 1)
+    score = match_rate - variance_weight * variance / max(mean * mean, 1e-12)
+
+    best = int(np.argmax(score))
+    return float(score[best]), float(match_rate[best]), float(variance[best]), draws[best].astype(int)
@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+ISSUE_COLUMNS = ["row", "column", "rule", "value"]
+
+# Rules that make a file unusable; every other rule is a warning
+FATAL_RULES = {"missing column", "empty file"}
+
+STUDENT_REQUIRED = ["name", "matric number"]
+LECTURER_REQUIRED = ["name"]
+
+def validate_students(df):
+    """
+    Checks a student frame and returns its issues table (see
+    validate_frame): required columns, blank names and matric numbers,
+    duplicate matric numbers and blank fields.
+    """
+    return validate_frame(df, STUDENT_REQUIRED, unique="matric number")
+
+def validate_lecturers(df):
+    """
+    Checks a lecturer frame and returns its issues table (see
+    validate_frame): a name column, blank and duplicate names, blank
+    fields and Max_Students values that are not positive whole numbers.
+    """
+    return validate_frame(df, LECTURER_REQUIRED, unique="name", limit="max_students")
+
+def validate_frame(df, required, unique=None, limit=None):
+    """
+    Runs every rule over whole columns at once and returns one row per
+    problem with columns row, column, rule and value. `row` is the 1-based
+    position of the data row (the header is not counted) and is empty for
+    file-level rules. Nothing stops at the first problem.
+    """
+    parts = []
+    missing = [col for col in required if col not in df.columns]
+    for col in missing:
+        parts.append(([None], col, "missing column", [""]))
+    if df.empty:
+        parts.append(([None], "", "empty file", [""]))
+        return _issue_frame(parts)
+
+    for col in required + ["field"]:
+        if col in df.columns:
+            blank = _blank(df[col])
+            _add(parts, df[col], blank, col, "blank")
+            if col == unique:
+                _add(parts, df[col], df[col].duplicated(keep=False).to_numpy() & ~blank, col, "duplicate")
+
+    if limit is not None and limit in df.columns:
+        values = df[limit]
+        blank = _blank(values)
+        number = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+        _add(parts, values, ~blank & np.isnan(number), limit, "not a number")
+        with np.errstate(invalid="ignore"):
+            _add(parts, values, number <= 0, limit, "not positive")
+            _add(parts, values, (number > 0) & (np.mod(number, 1) != 0), limit, "not a whole number")
+    return _issue_frame(parts)
+
+class BatchValidator:
+    """
+    Runs the rules of validate_frame over a file read in batches (see
+    utils.file_reader), one batch at a time. Row numbers continue across
+    batches, missing columns are reported once and duplicates of the
+    `unique` column are found across the whole file. Call add() with
+    each batch and finish() for the issues table.
+    """
+
+    def __init__(self, required, unique=None, limit=None):
+        self.required = required
+        self.unique = unique
+        self.limit = limit
+        self.batches = 0
+        self.rows = 0
+        self._parts = []
+        self._keys = []
+
+    def add(self, batch):
+        issues = validate_frame(batch, self.required, limit=self.limit)
+        issues = issues[issues["rule"] != "empty file"]
+        if self.batches:
+            issues = issues[issues["rule"] != "missing column"]
+        issues = issues.assign(row=issues["row"] + self.rows)
+        self._parts.append(issues)
+        if self.unique in batch.columns:
+            self._keys.append(batch[self.unique])
+        self.batches += 1
+        self.rows += len(batch)
+
+    def finish(self):
+        parts = list(self._parts)
+        if self.rows == 0:
+            parts.append(_issue_frame([([None], "", "empty file", [""])]))
+        elif self._keys:
+            keys = pd.concat(self._keys, ignore_index=True)
+            duplicates = []
+            _add(duplicates, keys, keys.duplicated(keep=False).to_numpy() & ~_blank(keys), self.unique, "duplicate")
+            parts.append(_issue_frame(duplicates))
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return _issue_frame([])
+        return pd.concat(parts, ignore_index=True)
+
+def student_batch_validator():
+    return BatchValidator(STUDENT_REQUIRED, unique="matric number")
+
+def lecturer_batch_validator():
+    return BatchValidator(LECTURER_REQUIRED, unique="name", limit="max_students")
+
+def is_fatal(issues):
+    return bool(issues["rule"].isin(FATAL_RULES).any())
+
+def issue_messages(issues, label, max_rows=5):
+    """
+    One readable line per (column, rule) for a "Student" or "Lecturer"
+    file, naming the first few rows affected.
+    """
+    messages = []
+    missing = issues.loc[issues["rule"] == "missing column", "column"].tolist()
+    if missing:
+        messages.append(f"{label} file is missing required columns: {', '.join(missing)}.")
+    if (issues["rule"] == "empty file").any():
+        messages.append(f"{label} file is empty.")
+    rows = issues[~issues["rule"].isin(FATAL_RULES)]
+    for (column, rule), group in rows.groupby(["column", "rule"], sort=False):
+        shown = ", ".join(str(r) for r in group["row"].head(max_rows))
+        more = ", …" if len(group) > max_rows else ""
+        messages.append(f"{label} file: {len(group)} row(s) with {_RULE_TEXT[rule]} '{column}' (rows {shown}{more}).")
+    return messages
+
+_RULE_TEXT = {
+    "blank": "a blank",
+    "duplicate": "a duplicate",
+    "not a number": "a non-numeric",
+    "not positive": "a zero or negative",
+    "not a whole number": "a fractional",
+}
+
+def _blank(series):
+    blank = series.isna().to_numpy()
+    if not pd.api.types.is_numeric_dtype(series.dtype):
+        blank = blank | series.astype(str).str.strip().eq("").to_numpy()
+    return blank
+
+def _add(parts, series, mask, column, rule):
+    rows = np.flatnonzero(mask)
+    if len(rows):
+        parts.append((rows + 1, column, rule, series.to_numpy()[rows]))
+
+def _issue_frame(parts):
+    if not parts:
+        return pd.DataFrame({"row": pd.Series([], dtype="Int64"), "column": [], "rule": [], "value": []}, columns=ISSUE_COLUMNS)
+    return pd.DataFrame({
+        "row": pd.array(np.concatenate([np.asarray(rows, dtype=float) for rows, _, _, _ in parts]), dtype="Int64"),
+        "column": np.repeat([column for _, column, _, _ in parts], [len(rows) for rows, _, _, _ in parts]),
+        "rule": np.repeat([rule for _, _, rule, _ in parts], [len(rows) for rows, _, _, _ in parts]),
+        "value": pd.Series(np.concatenate([np.asarray(values, dtype=object) for _, _, _, values in parts])).fillna("").astype(str).to_numpy(),
+    }, columns=ISSUE_COLUMNS)
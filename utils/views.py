@@ -0,0 +1,44 @@
+import pandas as pd
+from utils.cache import LRUCache, frame_fingerprint
+from utils.model import as_frame, assignment_columns
+
+# Collated views keyed by the content of the columns they show
+_collated_cache = LRUCache(max_bytes=64 * 1024 * 1024, max_entries=16)
+
+COLLATED_COLUMNS = ["assigned lecturer", "student name", "matric number"]
+
+def collated_view(assignment, fingerprint=None):
+    """
+    One row per lecturer (sorted by name) with the number of students and
+    their "- name (matric)" list as a Markdown string. Built with one
+    groupby and string join, and cached on the assignment's content;
+    pass the assignment's frame_fingerprint to skip hashing it again.
+    `assignment` may be an Assignment or its DataFrame; only the shown
+    columns are gathered, and only when the view is not cached.
+    """
+    key = ("collated", fingerprint or frame_fingerprint(as_frame(assignment)))
+    view = _collated_cache.get(key)
+    if view is None:
+        df = assignment_columns(assignment, COLLATED_COLUMNS)
+        # Missing names or matric numbers show as blanks rather than breaking the join
+        names = df["student name"].astype(str).where(df["student name"].notna(), "")
+        matrics = df["matric number"].astype(str).where(df["matric number"].notna(), "")
+        lines = "- " + names + " (" + matrics + ")"
+        grouped = lines.groupby(df["assigned lecturer"], sort=True)
+        view = pd.DataFrame({
+            "lecturer": grouped.size().index,
+            "students": grouped.size().to_numpy(),
+            "markdown": grouped.agg("\n".join).to_numpy(),
+        })
+        _collated_cache.put(key, view, int(view.memory_usage(deep=True).sum()))
+    return view
+
+def page_markdown(view, page, page_size):
+    """
+    Markdown for one page of a collated view, so a single element is sent
+    to the browser however many lecturers there are.
+    """
+    rows = view.iloc[(page - 1) * page_size:page * page_size]
+    return "\n\n---\n\n".join(
+        f"**{lecturer}:**\n\n{students}" for lecturer, students in zip(rows["lecturer"], rows["markdown"])
+    )